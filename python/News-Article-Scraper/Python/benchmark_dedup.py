@@ -0,0 +1,60 @@
+# Measures insert/query time and memory of NearDuplicateIndex.
+# Usage: python benchmark_dedup.py [number_of_articles]
+import random
+import sys
+import time
+import tracemalloc
+
+from dedup import NearDuplicateIndex, simhash, MAX_DISTANCE
+
+QUERIES = 100_000
+
+
+def flip_bits(fingerprint, count):
+    for bit in random.sample(range(64), count):
+        fingerprint ^= 1 << bit
+    return fingerprint
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    random.seed(42)
+    fingerprints = [random.getrandbits(64) for _ in range(total)]
+
+    tracemalloc.start()
+    index = NearDuplicateIndex()
+    start = time.perf_counter()
+    for fingerprint in fingerprints:
+        index.add(fingerprint)
+    insert_time = time.perf_counter() - start
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    near = [flip_bits(random.choice(fingerprints), random.randint(0, MAX_DISTANCE))
+            for _ in range(QUERIES)]
+    start = time.perf_counter()
+    found = sum(index.find(f) is not None for f in near)
+    near_time = time.perf_counter() - start
+
+    unrelated = [random.getrandbits(64) for _ in range(QUERIES)]
+    start = time.perf_counter()
+    false_hits = sum(index.find(f) is not None for f in unrelated)
+    miss_time = time.perf_counter() - start
+
+    body = ' '.join(random.choice(['news', 'market', 'city', 'report', 'today', 'vote'])
+                    for _ in range(600))
+    start = time.perf_counter()
+    for _ in range(1000):
+        simhash(body)
+    hash_time = time.perf_counter() - start
+
+    print(f"Articles indexed:     {total:,}")
+    print(f"Insert:               {insert_time:.2f} s ({insert_time / total * 1e6:.2f} us/article)")
+    print(f"Index memory:         {memory / 1024 / 1024:.1f} MiB ({memory / total:.1f} bytes/article)")
+    print(f"Query (duplicates):   {near_time / QUERIES * 1e6:.2f} us/query, {found:,}/{QUERIES:,} found")
+    print(f"Query (unique):       {miss_time / QUERIES * 1e6:.2f} us/query, {false_hits:,} false hits")
+    print(f"SimHash, 600 words:   {hash_time:.2f} ms/article")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+# Measures how fast worker processes can lease and complete URLs from one
+# Frontier file. Every third worker is killed halfway through to check that
+# its leased URLs are handed out again.
+# Usage: python benchmark_frontier.py [number_of_urls] [workers]
+import os
+import sys
+import tempfile
+import time
+from multiprocessing import Process
+
+from frontier import Frontier
+
+BATCH = 100
+LEASE_SECONDS = 2
+
+
+def worker(path, crash_after):
+    frontier = Frontier(path, lease_seconds=LEASE_SECONDS)
+    completed = 0
+    while True:
+        urls = frontier.get(BATCH)
+        if not urls:
+            if frontier.unfinished() == 0:
+                break
+            time.sleep(0.1)
+            continue
+        if crash_after is not None and completed >= crash_after:
+            os._exit(1)  # dies holding a lease
+        frontier.done_many(urls)
+        completed += len(urls)
+
+
+def run(path, total, workers):
+    processes = [Process(target=worker,
+                         args=(path, total // workers // 2 if i % 3 == 2 else None))
+                 for i in range(workers)]
+    start = time.perf_counter()
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+    return time.perf_counter() - start
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    worker_counts = [int(sys.argv[2])] if len(sys.argv) > 2 else [1, 4, 8]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in worker_counts:
+            path = os.path.join(tmp, f'frontier-{workers}.db')
+            urls = [f'https://www.example.com/news/{i}' for i in range(total)]
+            with Frontier(path) as frontier:
+                start = time.perf_counter()
+                frontier.add_many(urls)
+                add_time = time.perf_counter() - start
+                start = time.perf_counter()
+                again = frontier.add_many(urls[::10])
+                seen_time = time.perf_counter() - start
+
+            crawl_time = run(path, total, workers)
+
+            with Frontier(path) as frontier:
+                stats = frontier.stats()
+            size = os.path.getsize(path) / 1024 / 1024
+            print(f"Workers:          {workers} ({len(range(2, workers, 3))} killed)")
+            print(f"Add:              {total / add_time:,.0f} URLs/s, {size:.0f} MiB on disk")
+            print(f"Add (seen):       {len(urls[::10]) / seen_time:,.0f} URLs/s, {again} re-added")
+            print(f"Lease + done:     {total / crawl_time:,.0f} URLs/s")
+            print(f"Final state:      {stats}")
+            print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+# Writes synthetic article pages to a response archive, then replays them
+# through open_session("replay") and extract_article.
+# Usage: python benchmark_response_archive.py [number_of_pages]
+import os
+import random
+import sys
+import tempfile
+import time
+
+from news_article_scraper import extract_article
+from response_archive import ResponseArchive, open_session
+
+WORDS = ("market city report today vote council school weather police budget "
+         "election road hospital river team season price energy court").split()
+
+
+def make_page(i, rng) -> bytes:
+    paragraphs = ''.join(f"<p>{' '.join(rng.choices(WORDS, k=80))}</p>" for _ in range(30))
+    nav = ''.join(f'<li><a href="/section/{n}">Section {n}</a></li>' for n in range(100))
+    return (f"<html><head><title>Article {i}</title></head><body><nav><ul>{nav}</ul></nav>"
+            f"<h1>Article {i}</h1><div class='complete-story'>{paragraphs}</div>"
+            f"<footer>{nav}</footer></body></html>").encode()
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    rng = random.Random(42)
+    urls = [f"https://www.example.com/news/{i}" for i in range(total)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "responses")
+        raw = 0
+        with ResponseArchive(path, "a") as archive:
+            start = time.perf_counter()
+            for i, url in enumerate(urls):
+                page = make_page(i, rng)
+                raw += len(page)
+                archive.put(url, 200, {"Content-Type": "text/html; charset=utf-8"}, page, "OK")
+            write_time = time.perf_counter() - start
+            codec = archive.codec
+        stored = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path)
+                     if name.startswith("segment-"))
+
+        order = urls[:]
+        rng.shuffle(order)
+        with open_session("replay", path) as session:
+            start = time.perf_counter()
+            for url in order:
+                session.get(url).text
+            replay_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for url in order[:1000]:
+                extract_article(session.get(url).text)
+            extract_time = (time.perf_counter() - start) / min(1000, total) * total
+
+    print(f"Pages:               {total:,} ({raw / total / 1024:.0f} KiB each, codec {codec})")
+    print(f"Record:              {total / write_time:,.0f} pages/s, {raw / write_time / 2**20:.0f} MiB/s")
+    print(f"Archive size:        {stored / 2**20:.1f} MiB ({raw / stored:.1f}x smaller than the HTML)")
+    print(f"Replay, random order: {total / replay_time:,.0f} pages/s, {raw / replay_time / 2**20:.0f} MiB/s")
+    print(f"Replay + extract:    {total / extract_time:,.0f} pages/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+# Concurrent version of news_article_scraper.parse_articles:
+# pages are downloaded with aiohttp, parsed in a process pool and written
+# by a single writer task that reads from a bounded queue. With an archive
+# from response_archive.py, pages are recorded to it or replayed from it.
+import asyncio
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import aiohttp
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from dedup import NearDuplicateIndex
+from news_article_scraper import ARCHIVE_DIR, ARCHIVE_MODE, parse_sitemap, extract_article
+from response_archive import SKIPPED_HEADERS, open_session
+
+OUTPUT_CSV = "news.csv"
+FETCH_CONCURRENCY = 20
+QUEUE_SIZE = 100
+
+
+def decode(body, headers) -> str:
+    encoding = get_encoding_from_headers(CaseInsensitiveDict(headers)) or 'utf-8'
+    return body.decode(encoding, errors='replace')
+
+
+async def fetch(session, link, archive=None):
+    # archive opened with mode "r" answers instead of the network, with mode
+    # "a" every downloaded page is saved to it
+    if archive is not None and archive.mode == "r":
+        record = archive.get(link)
+        if record is None:
+            raise aiohttp.ClientConnectionError(f"{link} is not in the archive")
+        status, reason, headers, body = record
+        return decode(body, headers)
+
+    async with session.get(link) as response:
+        body = await response.read()
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in SKIPPED_HEADERS}
+        status, reason = response.status, response.reason or ""
+    if archive is not None:
+        # put() writes to disk, so it runs in a thread
+        await asyncio.get_running_loop().run_in_executor(
+            None, archive.put, link, status, headers, body, reason)
+    return decode(body, headers)
+
+
+async def worker(links, session, pool, queue, window, archive=None):
+    loop = asyncio.get_running_loop()
+    while True:
+        # The window limits how many articles are in flight or waiting to be
+        # written, so a slow page never lets the buffers grow without bound.
+        await window.acquire()
+        try:
+            index, link = next(links)
+        except StopIteration:
+            window.release()
+            return
+
+        try:
+            html = await fetch(session, link, archive)
+            article = await loop.run_in_executor(pool, extract_article, html)
+        except Exception as e:
+            print(f'Failed {link}: {e}')
+            article = None
+        await queue.put((index, article))
+
+
+async def write_rows(queue, file_name, ordered, window, dedup=None):
+    pending = {}
+    next_index = 0
+    with open(file_name, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=['Heading', 'Body'])
+        writer.writeheader()
+
+        def write(article):
+            if article is not None and (dedup is None or not dedup.is_duplicate(article['Body'])):
+                writer.writerow(article)
+            window.release()
+
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            index, article = item
+            if not ordered:
+                write(article)
+                continue
+
+            # Keep sitemap order: hold results until all earlier ones arrived
+            pending[index] = article
+            while next_index in pending:
+                write(pending.pop(next_index))
+                next_index += 1
+
+
+async def parse_articles(links, ordered=False, concurrency=FETCH_CONCURRENCY,
+                         queue_size=QUEUE_SIZE, parse_workers=None,
+                         file_name=OUTPUT_CSV, dedup=None, archive=None):
+    queue = asyncio.Queue(maxsize=queue_size)
+    window = asyncio.Semaphore(concurrency + queue_size)
+    links = enumerate(links)
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    with ProcessPoolExecutor(max_workers=parse_workers or os.cpu_count()) as pool:
+        async with aiohttp.ClientSession(connector=connector) as session:
+            writer = asyncio.create_task(write_rows(queue, file_name, ordered, window, dedup))
+            await asyncio.gather(*[
+                worker(links, session, pool, queue, window, archive)
+                for _ in range(concurrency)
+            ])
+            await queue.put(None)
+            await writer
+
+
+if __name__ == '__main__':
+    with open_session(ARCHIVE_MODE, ARCHIVE_DIR) as session:
+        links = parse_sitemap(session)
+        # The articles use the same archive as the sitemap
+        asyncio.run(parse_articles(links, ordered=True, dedup=NearDuplicateIndex(),
+                                   archive=getattr(session, 'archive', None)))
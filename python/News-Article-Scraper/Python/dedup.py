@@ -0,0 +1,132 @@
+# Near-duplicate detection for article bodies using 64-bit SimHash.
+#
+# Two bodies are considered near duplicates when their fingerprints differ in
+# at most MAX_DISTANCE bits. The fingerprint is split into MAX_DISTANCE + 1
+# bands, so any two near duplicates share at least one identical band, and
+# only the entries in those band buckets need to be compared.
+#
+# Texts with fewer than MIN_SHINGLES shingles are never duplicates. An empty
+# or very short body has no usable fingerprint, it would otherwise match every
+# other one. The index can be saved to and loaded from a file of fingerprints,
+# so it can cover several runs.
+import hashlib
+import os
+import re
+from array import array
+
+FINGERPRINT_BITS = 64
+MAX_DISTANCE = 3
+SHINGLE_SIZE = 3
+MIN_SHINGLES = 5
+
+WORD_RE = re.compile(r"\w+")
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    words = WORD_RE.findall(text.lower())
+    if len(words) < size:
+        return [' '.join(words)] if words else []
+    return [' '.join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+
+def simhash(text) -> int:
+    return fingerprint_of(shingles(text))
+
+
+def fingerprint_of(text_shingles) -> int:
+    counts = [0] * FINGERPRINT_BITS
+    for shingle in text_shingles:
+        digest = hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest()
+        h = int.from_bytes(digest, "big")
+        for bit in range(FINGERPRINT_BITS):
+            counts[bit] += 1 if h >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, count in enumerate(counts):
+        if count > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+class NearDuplicateIndex:
+    def __init__(self, max_distance=MAX_DISTANCE, min_shingles=MIN_SHINGLES):
+        self.max_distance = max_distance
+        self.min_shingles = min_shingles
+        self.bands = max_distance + 1
+        self.band_bits = -(-FINGERPRINT_BITS // self.bands)
+        self.band_mask = (1 << self.band_bits) - 1
+        self.clear()
+
+    def clear(self):
+        # Fingerprints are stored in one flat array, buckets only hold
+        # 32-bit positions into it.
+        self.fingerprints = array('Q')
+        self.buckets = [{} for _ in range(self.bands)]
+        self.saved = 0  # fingerprints already written by save()
+
+    def load(self, path, count=None):
+        # Adds the fingerprints saved in path, if the file exists. A record cut
+        # short by a crash during save() is dropped from the file, and so is
+        # everything after the first count fingerprints.
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                data = f.read()
+            fingerprints = array('Q')
+            size = len(data) - len(data) % fingerprints.itemsize
+            if count is not None:
+                size = min(size, count * fingerprints.itemsize)
+            if size < len(data):
+                os.truncate(path, size)
+            fingerprints.frombytes(data[:size])
+            for fingerprint in fingerprints:
+                self.add(fingerprint)
+        self.saved = len(self.fingerprints)
+        return self
+
+    def save(self, path):
+        # Appends the fingerprints added since the last load() or save(). After
+        # clear() the file is started anew.
+        with open(path, 'ab' if self.saved else 'wb') as f:
+            self.fingerprints[self.saved:].tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+        self.saved = len(self.fingerprints)
+
+    def __len__(self):
+        return len(self.fingerprints)
+
+    def _band_keys(self, fingerprint):
+        for band in range(self.bands):
+            yield band, fingerprint >> (band * self.band_bits) & self.band_mask
+
+    def add(self, fingerprint) -> int:
+        doc_id = len(self.fingerprints)
+        self.fingerprints.append(fingerprint)
+        for band, key in self._band_keys(fingerprint):
+            bucket = self.buckets[band].get(key)
+            if bucket is None:
+                bucket = self.buckets[band][key] = array('I')
+            bucket.append(doc_id)
+        return doc_id
+
+    def find(self, fingerprint):
+        # Returns the id of a stored near duplicate, or None
+        for band, key in self._band_keys(fingerprint):
+            bucket = self.buckets[band].get(key)
+            if bucket is None:
+                continue
+            for doc_id in bucket:
+                if (self.fingerprints[doc_id] ^ fingerprint).bit_count() <= self.max_distance:
+                    return doc_id
+        return None
+
+    def is_duplicate(self, text) -> bool:
+        # Checks the text and remembers it if it is not a duplicate
+        text_shingles = shingles(text)
+        if len(text_shingles) < self.min_shingles:
+            return False
+        fingerprint = fingerprint_of(text_shingles)
+        if self.find(fingerprint) is not None:
+            return True
+        self.add(fingerprint)
+        return False
@@ -1,10 +1,57 @@
-from bs4 import BeautifulSoup
-import requests
+from bs4 import BeautifulSoup, ElementFilter, SoupStrainer
 import csv
+import hashlib
+import json
+import os
 
+from dedup import NearDuplicateIndex
+from frontier import Frontier
+from response_archive import open_session
 
-def parse_sitemap() -> list:
-    response = requests.get("https://www.example.com/sitemap.xml")
+SITEMAP_URL = "https://www.example.com/sitemap.xml"
+OUTPUT_CSV = "news.csv"
+INDEX_FILE = "news_index.json"
+FRONTIER_FILE = "news_frontier.db"
+DEDUP_FILE = "news_dedup.bin"  # fingerprints kept between incremental or resumable runs
+INCREMENTAL = True
+RESUMABLE = False
+# Set to "record" to keep the sitemap and every article in ARCHIVE_DIR, then
+# to "replay" to run a changed extract_article over them offline
+ARCHIVE_MODE = None
+ARCHIVE_DIR = "responses"
+DEDUP = True
+
+
+class AnyOf(ElementFilter):
+    # Keeps a tag if any of the given strainers would keep it. ElementFilter
+    # and allow_tag_creation are public since Beautiful Soup 4.13
+    def __init__(self, *strainers):
+        super().__init__()
+        self.strainers = strainers
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        return any(s.allow_tag_creation(nsprefix, name, attrs) for s in self.strainers)
+
+    def allow_string_creation(self, string):
+        return False
+
+
+def has_class(class_name):
+    # While parsing, class is still the raw string, e.g. "story complete-story"
+    def match(value):
+        if value is None:
+            return False
+        classes = value.split() if isinstance(value, str) else value
+        return class_name in classes
+    return match
+
+
+# Only these parts of an article page are turned into a tree
+ARTICLE_STRAINER = AnyOf(SoupStrainer('h1'), SoupStrainer(class_=has_class('complete-story')))
+
+
+def parse_sitemap(session) -> list:
+    response = session.get(SITEMAP_URL)
     if response.status_code != 200:
         return None
     xml_as_str = response.text
@@ -19,24 +66,179 @@ def parse_sitemap() -> list:
     return links
 
 
-def parse_articles(links: list):
-    s = requests.Session()
-    with open("news.csv", "w", encoding="utf-8", newline="") as f:
+def parse_sitemap_entries(session) -> list:
+    # Same as parse_sitemap, but keeps <lastmod> next to each link
+    response = session.get(SITEMAP_URL)
+    if response.status_code != 200:
+        return None
+
+    soup = BeautifulSoup(response.text, "lxml")
+    entries = []
+    for url in soup.find_all("url"):
+        loc = url.find("loc")
+        if loc is None:
+            continue
+        lastmod = url.find("lastmod")
+        entries.append((loc.text.strip(), lastmod.text.strip() if lastmod else None))
+
+    print(f'Found {len(entries)} links')
+    return entries
+
+
+def parse_article(session, link) -> dict:
+    response = session.get(link)
+    return extract_article(response.text)
+
+
+def extract_article(html) -> dict:
+    soup = BeautifulSoup(html, "lxml", parse_only=ARTICLE_STRAINER)
+    heading = soup.select_one('h1').text
+    para = []
+    for p in soup.select('.complete-story p'):
+        para.append(p.text)
+    body = '\n'.join(para)
+    return {'Heading': heading,
+            'Body': body
+            }
+
+
+def parse_articles(session, links: list, dedup=None):
+    with open(OUTPUT_CSV, "w", encoding="utf-8", newline="") as f:
         writer = csv.DictWriter(f, fieldnames=['Heading', 'Body'])
         writer.writeheader()
         for link in links:
-            response = s.get(link)
-            soup = BeautifulSoup(response.text, "lxml")
-            heading = soup.select_one('h1').text
-            para = []
-            for p in soup.select('.complete-story p'):
-                para.append(p.text)
-            body = '\n'.join(para)
-            writer.writerow({'Heading': heading,
-                             'Body': body
-                             })
+            article = parse_article(session, link)
+            if dedup is not None and dedup.is_duplicate(article['Body']):
+                continue
+            writer.writerow(article)
+
+
+def parse_articles_resumable(session, links: list, frontier_file=FRONTIER_FILE, dedup=None,
+                             dedup_file=DEDUP_FILE):
+    # Like parse_articles, but the progress is kept in frontier_file. When
+    # the script is restarted after a crash it skips the finished links and
+    # appends to the existing CSV. Once every link is done, the next run
+    # starts a new CSV and a new frontier.
+    with Frontier(frontier_file) as frontier:
+        frontier.release()
+        resume = frontier.unfinished() > 0 and os.path.exists(OUTPUT_CSV)
+        if not resume:
+            frontier.reset()
+        checkpoint = frontier.checkpoint()
+        if resume and 'csv_size' in checkpoint:
+            # Rows written after the last checkpoint belong to links that are
+            # not marked as done, they are parsed and written again
+            os.truncate(OUTPUT_CSV, checkpoint['csv_size'])
+        if dedup is not None:
+            # A resumed crawl also skips duplicates of the rows written before
+            # the crash, a new crawl starts with an empty index
+            if resume:
+                dedup.load(dedup_file, checkpoint.get('dedup_size'))
+            else:
+                dedup.clear()
+                dedup.save(dedup_file)
+        with open(OUTPUT_CSV, "a" if resume else "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=['Heading', 'Body'])
+            if not resume:
+                writer.writeheader()
+                f.flush()
+                frontier.save_checkpoint({'csv_size': f.tell(), 'dedup_size': 0})
+            frontier.add_many(links)
+            while True:
+                batch = frontier.get(100)
+                if not batch:
+                    break
+                finished, rows = [], []
+                for link in batch:
+                    try:
+                        article = parse_article(session, link)
+                    except Exception as e:
+                        print(f'Failed {link}: {e}')
+                        frontier.fail(link)
+                        continue
+                    if dedup is None or not dedup.is_duplicate(article['Body']):
+                        rows.append(article)
+                    finished.append(link)
+                # The rows of a batch are synced to disk before its links are
+                # marked as done, together with the new size of the CSV
+                writer.writerows(rows)
+                f.flush()
+                os.fsync(f.fileno())
+                checkpoint = {'csv_size': f.tell()}
+                if dedup is not None:
+                    dedup.save(dedup_file)
+                    checkpoint['dedup_size'] = len(dedup)
+                frontier.done_many(finished, checkpoint=checkpoint)
+        print(f'Frontier: {frontier.stats()}')
+
+
+def load_index(file_name) -> dict:
+    if not os.path.exists(file_name):
+        return {}
+    with open(file_name, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_index(index, file_name):
+    # Write to a temporary file first so a crash never leaves a broken index
+    tmp_name = file_name + ".tmp"
+    with open(tmp_name, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(tmp_name, file_name)
+
+
+def content_hash(article) -> str:
+    text = article['Heading'] + '\n' + article['Body']
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def parse_articles_incremental(session, entries: list, index_file=INDEX_FILE, dedup=None,
+                               dedup_file=DEDUP_FILE):
+    # Only fetches links that are new or whose <lastmod> changed since the
+    # last run, and appends articles whose content actually changed. New
+    # links are checked against the articles of all earlier runs, a changed
+    # article is not dropped as a near duplicate of its own older version.
+    index = load_index(index_file)
+    if dedup is not None:
+        dedup.load(dedup_file)
+    write_header = not os.path.exists(OUTPUT_CSV)
+    fetched = written = 0
+
+    try:
+        with open(OUTPUT_CSV, "a", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=['Heading', 'Body'])
+            if write_header:
+                writer.writeheader()
+            for link, lastmod in entries:
+                seen = index.get(link)
+                if seen and lastmod and seen['lastmod'] == lastmod:
+                    continue
+
+                article = parse_article(session, link)
+                fetched += 1
+                digest = content_hash(article)
+                changed = not seen or seen['hash'] != digest
+                if changed and (seen or dedup is None or not dedup.is_duplicate(article['Body'])):
+                    writer.writerow(article)
+                    written += 1
+                index[link] = {'lastmod': lastmod, 'hash': digest}
+    finally:
+        save_index(index, index_file)
+        if dedup is not None:
+            dedup.save(dedup_file)
+
+    print(f'Fetched {fetched} articles, wrote {written} new or changed')
 
 
 if __name__ == '__main__':
-    links = parse_sitemap()
-    parse_articles(links)
+    dedup = NearDuplicateIndex() if DEDUP else None
+    with open_session(ARCHIVE_MODE, ARCHIVE_DIR) as session:
+        if INCREMENTAL:
+            entries = parse_sitemap_entries(session)
+            parse_articles_incremental(session, entries, dedup=dedup)
+        elif RESUMABLE:
+            links = parse_sitemap(session)
+            parse_articles_resumable(session, links, dedup=dedup)
+        else:
+            links = parse_sitemap(session)
+            parse_articles(session, links, dedup=dedup)
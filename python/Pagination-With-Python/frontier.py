@@ -0,0 +1,171 @@
+# A crawl frontier stored in SQLite, so an interrupted crawl can resume.
+#
+# Every URL is stored once (the UNIQUE constraint doubles as the "seen" set)
+# and moves from pending to leased to done. A worker leases a batch of URLs
+# for LEASE_SECONDS; if it dies before calling done() the lease expires and
+# the URLs are handed out again, up to MAX_ATTEMPTS times.
+#
+# The database runs in WAL mode, so any number of processes can open the same
+# file. Open one Frontier per process; within a process it can be shared by
+# threads.
+#
+# A checkpoint of small values, such as the size of an output file, can be
+# saved in the same transaction as done_many(). A crawl that resumes from it
+# knows exactly which output belongs to finished URLs.
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+LEASE_SECONDS = 300
+MAX_ATTEMPTS = 3
+
+PENDING, LEASED, DONE, FAILED = range(4)
+STATES = {PENDING: 'pending', LEASED: 'leased', DONE: 'done', FAILED: 'failed'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS frontier (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    priority INTEGER NOT NULL DEFAULT 0,
+    state INTEGER NOT NULL DEFAULT 0,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS frontier_pending ON frontier (priority DESC, id) WHERE state = 0;
+CREATE INDEX IF NOT EXISTS frontier_leased ON frontier (lease_until) WHERE state = 1;
+CREATE TABLE IF NOT EXISTS checkpoint (
+    key TEXT PRIMARY KEY,
+    value
+);
+"""
+
+
+class Frontier:
+    def __init__(self, path, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        # Transactions are started explicitly, see _transaction().
+        # States are written into the SQL as literals, otherwise SQLite
+        # cannot use the partial indexes.
+        self.db = sqlite3.connect(path, timeout=60, isolation_level=None,
+                                  check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    @contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front, so two processes never
+        # lease the same URLs
+        with self._lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.db
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+            else:
+                self.db.execute("COMMIT")
+
+    def add(self, url, priority=0) -> bool:
+        return self.add_many([url], priority) == 1
+
+    def add_many(self, urls, priority=0) -> int:
+        # URLs that were ever added before are ignored, whatever their state
+        with self._transaction() as db:
+            cursor = db.executemany(
+                "INSERT OR IGNORE INTO frontier (url, priority) VALUES (?, ?)",
+                ((url, priority) for url in urls))
+            return cursor.rowcount
+
+    def get(self, n=1) -> list:
+        # Leases up to n pending URLs, highest priority first
+        now = time.time()
+        with self._transaction() as db:
+            self._expire(db, now)
+            rows = db.execute(
+                f"UPDATE frontier SET state = {LEASED}, lease_until = ?, attempts = attempts + 1 "
+                f"WHERE id IN (SELECT id FROM frontier WHERE state = {PENDING} "
+                "ORDER BY priority DESC, id LIMIT ?) "
+                "RETURNING url, priority, id",
+                (now + self.lease_seconds, n)).fetchall()
+        # RETURNING gives no guarantee about the order of the rows
+        rows.sort(key=lambda row: (-row[1], row[2]))
+        return [row[0] for row in rows]
+
+    def _expire(self, db, now):
+        db.execute(
+            f"UPDATE frontier SET state = CASE WHEN attempts >= ? THEN {FAILED} ELSE {PENDING} END, "
+            f"lease_until = NULL WHERE state = {LEASED} AND lease_until < ?",
+            (self.max_attempts, now))
+
+    def done(self, url, links=(), priority=0):
+        self.done_many([url], links, priority)
+
+    def done_many(self, urls, links=(), priority=0, checkpoint=None):
+        # Marks a whole batch as done in one transaction. Discovered links and
+        # the checkpoint are saved in the same transaction, so a crash never
+        # loses them once the pages are marked as done
+        with self._transaction() as db:
+            db.executemany(f"UPDATE frontier SET state = {DONE}, lease_until = NULL WHERE url = ?",
+                           ((url,) for url in urls))
+            db.executemany("INSERT OR IGNORE INTO frontier (url, priority) VALUES (?, ?)",
+                           ((link, priority) for link in links))
+            if checkpoint:
+                db.executemany("INSERT OR REPLACE INTO checkpoint (key, value) VALUES (?, ?)",
+                               checkpoint.items())
+
+    def save_checkpoint(self, checkpoint):
+        self.done_many([], checkpoint=checkpoint)
+
+    def checkpoint(self) -> dict:
+        # The values saved by the last done_many() or save_checkpoint()
+        with self._lock:
+            return dict(self.db.execute("SELECT key, value FROM checkpoint").fetchall())
+
+    def fail(self, url):
+        # Puts the URL back, unless it has used up its attempts
+        with self._transaction() as db:
+            db.execute(
+                f"UPDATE frontier SET state = CASE WHEN attempts >= ? THEN {FAILED} ELSE {PENDING} END, "
+                f"lease_until = NULL WHERE url = ? AND state = {LEASED}",
+                (self.max_attempts, url))
+
+    def release(self):
+        # Returns every lease at once. Only safe when no other worker is
+        # running, e.g. when a single-process crawl restarts after a crash.
+        with self._transaction() as db:
+            db.execute(f"UPDATE frontier SET state = {PENDING}, lease_until = NULL "
+                       f"WHERE state = {LEASED}")
+
+    def reset(self):
+        # Forgets every URL, so the next crawl starts from scratch. Call it when
+        # unfinished() is 0 at the start of a run, i.e. the last crawl completed
+        with self._transaction() as db:
+            db.execute("DELETE FROM frontier")
+            db.execute("DELETE FROM checkpoint")
+
+    def unfinished(self) -> int:
+        # Pending and leased URLs; when this is 0 the crawl is complete
+        with self._lock:
+            return self.db.execute(f"SELECT count(*) FROM frontier "
+                                   f"WHERE state IN ({PENDING}, {LEASED})").fetchone()[0]
+
+    def stats(self) -> dict:
+        counts = dict.fromkeys(STATES.values(), 0)
+        with self._lock:
+            rows = self.db.execute("SELECT state, count(*) FROM frontier GROUP BY state").fetchall()
+        for state, count in rows:
+            counts[STATES[state]] = count
+        return counts
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
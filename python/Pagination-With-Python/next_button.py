@@ -3,24 +3,39 @@ import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 
+from frontier import Frontier
+
+START_URL = 'http://books.toscrape.com/catalogue/category/books/fantasy_19/index.html'
+# Pages that were already processed are remembered here, so an interrupted
+# run continues from the last page instead of the first one. A run that
+# finds every page done starts over from START_URL.
+FRONTIER_FILE = 'next_button_frontier.db'
 
 def process_pages():
-    url = 'http://books.toscrape.com/catalogue/category/books/fantasy_19/index.html'
-
-    while True:
-        response = requests.get(url)
-        soup = BeautifulSoup(response.text, "lxml")
-
-        footer_element = soup.select_one('li.current')
-        print(footer_element.text.strip())
-
-        # Pagination
-        next_page_element = soup.select_one('li.next > a')
-        if next_page_element:
-            next_page_url = next_page_element.get('href')
-            url = urljoin(url, next_page_url)
-        else:
-            break
+    with Frontier(FRONTIER_FILE) as frontier:
+        frontier.release()
+        if frontier.unfinished() == 0:
+            frontier.reset()  # the last crawl completed
+        frontier.add(START_URL)
+
+        while True:
+            urls = frontier.get()
+            if not urls:
+                break
+            url = urls[0]
+            response = requests.get(url)
+            soup = BeautifulSoup(response.text, "lxml")
+
+            footer_element = soup.select_one('li.current')
+            print(footer_element.text.strip())
+
+            # Pagination
+            links = []
+            next_page_element = soup.select_one('li.next > a')
+            if next_page_element:
+                next_page_url = next_page_element.get('href')
+                links.append(urljoin(url, next_page_url))
+            frontier.done(url, links)
 
 
 if __name__ == '__main__':
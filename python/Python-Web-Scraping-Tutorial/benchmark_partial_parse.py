@@ -0,0 +1,47 @@
+# Compares parsing a whole page with parsing only the table of contents.
+# Usage: python benchmark_partial_parse.py [url or local html file]
+import sys
+import time
+import tracemalloc
+
+import requests
+from bs4 import BeautifulSoup
+
+from wiki_toc import TOC_STRAINER
+
+RUNS = 5
+
+
+def load(source):
+    if source.startswith("http"):
+        return requests.get(source).text
+    with open(source, encoding="utf-8") as f:
+        return f.read()
+
+
+def measure(html, **kwargs):
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        BeautifulSoup(html, "lxml", **kwargs)
+    elapsed = (time.perf_counter() - start) / RUNS
+
+    tracemalloc.start()
+    soup = BeautifulSoup(html, "lxml", **kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, len(soup.find_all(True))
+
+
+def main():
+    source = sys.argv[1] if len(sys.argv) > 1 else "https://en.wikipedia.org/wiki/Python_(programming_language)"
+    html = load(source)
+    print(f"Page size: {len(html) / 1024:.0f} KiB")
+
+    print(f"{'parse':<10}{'time':>10}{'peak memory':>14}{'tags':>8}")
+    for name, kwargs in (("full", {}), ("toc only", {"parse_only": TOC_STRAINER})):
+        elapsed, peak, tags = measure(html, **kwargs)
+        print(f"{name:<10}{elapsed * 1000:>8.0f}ms{peak / 1024 / 1024:>11.1f}MiB{tags:>8}")
+
+
+if __name__ == "__main__":
+    main()
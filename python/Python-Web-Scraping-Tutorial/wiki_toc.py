@@ -1,12 +1,20 @@
 import csv
-import requests
-from bs4 import BeautifulSoup
-import requests
+from bs4 import BeautifulSoup, SoupStrainer
 
+from response_archive import open_session
 
-def get_data(url):
-    response = requests.get(url)
-    soup = BeautifulSoup(response.text, 'lxml')
+# Only the table of contents is turned into a tree, the rest is skipped
+TOC_STRAINER = SoupStrainer("div", id="toc")
+
+# "record" saves both Wikipedia articles to ARCHIVE_DIR, "replay" parses the
+# saved copies, so new selectors can be tried without hitting Wikipedia
+ARCHIVE_MODE = None
+ARCHIVE_DIR = "responses"
+
+
+def get_data(session, url):
+    response = session.get(url)
+    soup = BeautifulSoup(response.text, 'lxml', parse_only=TOC_STRAINER)
     table_of_contents = soup.find("div", id="toc")
     headings = table_of_contents.find_all("li")
     data = []
@@ -28,15 +36,16 @@ def export_data(data, file_name):
 
 
 def main():
-    url_to_parse = "https://en.wikipedia.org/wiki/Python_(programming_language)"
-    file_name = "python_toc.csv"
-    data = get_data(url_to_parse)
-    export_data(data, file_name)
-
-    url_to_parse = "https://en.wikipedia.org/wiki/Web_scraping"
-    file_name = "web_scraping_toc.csv"
-    data = get_data(url_to_parse)
-    export_data(data, file_name)
+    with open_session(ARCHIVE_MODE, ARCHIVE_DIR) as session:
+        url_to_parse = "https://en.wikipedia.org/wiki/Python_(programming_language)"
+        file_name = "python_toc.csv"
+        data = get_data(session, url_to_parse)
+        export_data(data, file_name)
+
+        url_to_parse = "https://en.wikipedia.org/wiki/Web_scraping"
+        file_name = "web_scraping_toc.csv"
+        data = get_data(session, url_to_parse)
+        export_data(data, file_name)
 
     print('Done')
 
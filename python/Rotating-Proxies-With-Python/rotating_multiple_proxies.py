@@ -3,23 +3,35 @@ import csv
 import requests
 from requests.exceptions import ProxyError, ReadTimeout, ConnectTimeout
 
+from retry import Retrier, check_status
+
 TIMEOUT_IN_SECONDS = 10
 CSV_FILENAME = 'proxies.csv'
+URL_TO_CHECK = 'https://ip.oxylabs.io'
+
+# Every proxy gets a few attempts with backoff before it is skipped
+retrier = Retrier(retry_on=(ProxyError, ReadTimeout, ConnectTimeout), attempts=3)
+
+
+def get_via_proxy(proxy):
+    response = requests.get(
+        URL_TO_CHECK,
+        proxies={'https': proxy},
+        timeout=TIMEOUT_IN_SECONDS,
+    )
+    check_status(response.status_code, response.headers)
+    return response
+
 
 with open(CSV_FILENAME) as open_file:
     reader = csv.reader(open_file)
     for csv_row in reader:
-        scheme_proxy_map = {
-            'https': csv_row[0],
-        }
-
         try:
-            response = requests.get(
-                'https://ip.oxylabs.io',
-                proxies=scheme_proxy_map,
-                timeout=TIMEOUT_IN_SECONDS,
-            )
-        except (ProxyError, ReadTimeout, ConnectTimeout) as error:
-            pass
+            response = retrier.call(csv_row[0], get_via_proxy)
+        except retrier.errors:
+            continue
         else:
             print(response.text)
+
+# Failed proxies are listed here instead of being dropped silently
+print(retrier.summary())
@@ -0,0 +1,136 @@
+# Extracts JSON data embedded in inline <script> tags without a browser:
+#   var data = [...];  let x = {...};  window.__INITIAL_STATE__ = {...};
+#   <script id="__NEXT_DATA__" type="application/json">
+#   <script type="application/ld+json">
+# Every inline script is scanned once. Valid JSON is decoded in place by the C
+# decoder, which also finds where it ends; anything else is skipped with a
+# bracket counter instead of a lazy regular expression.
+import json
+import re
+
+import requests
+
+SCRIPT_OPEN_RE = re.compile(r'<script\b([^>]*)>', re.I)
+SCRIPT_CLOSE_RE = re.compile(r'</script\s*>', re.I)
+SRC_RE = re.compile(r'\bsrc\s*=', re.I)
+TYPE_RE = re.compile(r'\btype\s*=\s*["\']?([^"\'\s>]+)', re.I)
+ID_RE = re.compile(r'\bid\s*=\s*["\']?([^"\'\s>]+)', re.I)
+ASSIGNMENT_RE = re.compile(
+    r'(?=[vlcw])(?:\b(?:var|let|const)\s+([A-Za-z_$][\w$]*)'
+    r'|\bwindow\.([A-Za-z_$][\w$]*)'
+    r'|\bwindow\[\s*["\']([^"\']+)["\']\s*\])'
+    r'\s*=\s*(?=[\[{])'
+)
+# Characters that matter for bracket counting, everything else is skipped in C
+SPECIAL_RE = re.compile(r'[{}\[\]"\'`/]')
+STRING_END_RE = {quote: re.compile(r'\\.|' + quote, re.S) for quote in '"\'`'}
+
+
+decoder = json.JSONDecoder()
+
+
+def iter_inline_scripts(html):
+    position = 0
+    while True:
+        opening = SCRIPT_OPEN_RE.search(html, position)
+        if opening is None:
+            return
+        closing = SCRIPT_CLOSE_RE.search(html, opening.end())
+        if closing is None:
+            return
+        yield opening.group(1), html[opening.end():closing.start()]
+        position = closing.end()
+
+
+def find_object_end(text, start):
+    # text[start] is "{" or "[". Returns the index after the matching bracket.
+    depth = 0
+    position = start
+    while True:
+        match = SPECIAL_RE.search(text, position)
+        if match is None:
+            return None
+        char = match.group()
+        position = match.end()
+        if char in '{[':
+            depth += 1
+        elif char in '}]':
+            depth -= 1
+            if depth == 0:
+                return position
+        elif char == '/':
+            # Skip comments, a quote or bracket inside one does not count.
+            # Any other slash is a division or a regex literal and is ignored.
+            following = text[position:position + 1]
+            if following == '/':
+                end = text.find('\n', position)
+                if end == -1:
+                    return None
+                position = end + 1
+            elif following == '*':
+                end = text.find('*/', position + 1)
+                if end == -1:
+                    return None
+                position = end + 2
+        else:
+            # Skip the whole string, brackets inside it do not count
+            string_end_re = STRING_END_RE[char]
+            while True:
+                end = string_end_re.search(text, position)
+                if end is None:
+                    return None
+                position = end.end()
+                if end.group() == char:
+                    break
+
+
+def parse_assignments(script, state):
+    position = 0
+    while True:
+        match = ASSIGNMENT_RE.search(script, position)
+        if match is None:
+            return
+        name = match.group(1) or match.group(2) or match.group(3)
+        try:
+            data, end = decoder.raw_decode(script, match.end())
+            state.setdefault(name, data)
+        except ValueError:
+            # A JavaScript literal that is not valid JSON, skip over it. If its
+            # end cannot be found, go on right after the "=" so the assignments
+            # that follow are still found.
+            end = find_object_end(script, match.end())
+            if end is None:
+                end = match.end()
+        position = end
+
+
+def extract_embedded_state(html) -> dict:
+    state = {}
+    for attributes, script in iter_inline_scripts(html):
+        if SRC_RE.search(attributes) or not script.strip():
+            continue
+
+        script_type = TYPE_RE.search(attributes)
+        script_type = script_type.group(1).lower() if script_type else ''
+        if script_type == 'application/ld+json':
+            try:
+                state.setdefault('ld+json', []).append(json.loads(script))
+            except ValueError:
+                pass
+        elif script_type == 'application/json':
+            script_id = ID_RE.search(attributes)
+            try:
+                state.setdefault(script_id.group(1) if script_id else 'json', json.loads(script))
+            except ValueError:
+                pass
+        else:
+            parse_assignments(script, state)
+    return state
+
+
+if __name__ == '__main__':
+    response = requests.get('https://quotes.toscrape.com/js/')
+    state = extract_embedded_state(response.text)
+    # prints only the author
+    for i in state['data']:
+        print(i['author']['name'])
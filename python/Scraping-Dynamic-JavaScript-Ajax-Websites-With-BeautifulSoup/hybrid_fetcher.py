@@ -0,0 +1,104 @@
+# Static-first fetching: a page is downloaded with requests first and only
+# rendered in headless Chrome if the data cannot be found in the raw HTML.
+# The decision is remembered per host and first path segment, so later URLs
+# of the same kind go straight to the path that worked.
+import json
+import os
+from urllib.parse import urlparse
+
+import requests
+from bs4 import BeautifulSoup
+from selenium.webdriver import Chrome, ChromeOptions
+
+from embedded_state import extract_embedded_state
+
+DECISIONS_FILE = 'render_decisions.json'
+STATIC = 'static'
+BROWSER = 'browser'
+
+
+def create_driver():
+    options = ChromeOptions()
+    options.headless = True
+    # update executable_path as required
+    return Chrome(executable_path='c:/driver/chromedriver.exe', options=options)
+
+
+def url_pattern(url):
+    # https://quotes.toscrape.com/js/page/2/ -> quotes.toscrape.com/js
+    parsed = urlparse(url)
+    segments = [segment for segment in parsed.path.split('/') if segment]
+    return parsed.netloc + '/' + (segments[0] if segments else '')
+
+
+class HybridFetcher:
+    def __init__(self, decisions_file=DECISIONS_FILE, driver_factory=create_driver):
+        self.decisions_file = decisions_file
+        self.driver_factory = driver_factory
+        self.session = requests.Session()
+        self.driver = None
+        self.decisions = {}
+        if decisions_file and os.path.exists(decisions_file):
+            with open(decisions_file) as f:
+                self.decisions = json.load(f)
+
+    def get(self, url, extract):
+        # extract(html) returns the data, or None when it is missing
+        pattern = url_pattern(url)
+        if self.decisions.get(pattern) != BROWSER:
+            data = extract(self.session.get(url).text)
+            if data is not None:
+                self._remember(pattern, STATIC)
+                return data
+
+        data = extract(self.render(url))
+        if data is not None:
+            self._remember(pattern, BROWSER)
+        return data
+
+    def render(self, url):
+        # The browser is only started when a page actually needs it
+        if self.driver is None:
+            self.driver = self.driver_factory()
+        self.driver.get(url)
+        return self.driver.page_source
+
+    def _remember(self, pattern, decision):
+        if self.decisions.get(pattern) == decision:
+            return
+        self.decisions[pattern] = decision
+        if self.decisions_file:
+            with open(self.decisions_file, 'w') as f:
+                json.dump(self.decisions, f, indent=2)
+
+    def close(self):
+        if self.driver is not None:
+            self.driver.quit()
+            self.driver = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def extract_authors(html):
+    # Data embedded in the page, see embedded_state.py
+    state = extract_embedded_state(html)
+    if 'data' in state:
+        return [item['author']['name'] for item in state['data']]
+
+    # Rendered page, see selenium_bs4.py
+    soup = BeautifulSoup(html, "lxml")
+    all_author_elements = soup.find_all("small", class_="author")
+    if all_author_elements:
+        return [element.text for element in all_author_elements]
+    return None
+
+
+if __name__ == '__main__':
+    with HybridFetcher() as fetcher:
+        for page in range(1, 11):
+            url = f'https://quotes.toscrape.com/js/page/{page}/'
+            print(url, fetcher.get(url, extract_authors))
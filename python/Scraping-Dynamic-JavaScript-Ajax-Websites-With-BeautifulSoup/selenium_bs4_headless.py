@@ -1,6 +1,8 @@
 from selenium.webdriver import Chrome, ChromeOptions
 from bs4 import BeautifulSoup
 
+from lean_render import enable_lean_render
+
 # Hide the browser
 options = ChromeOptions()
 options.headless = True
@@ -8,6 +10,10 @@ options.headless = True
 # update executable_path as required
 driver = Chrome(executable_path='c:/driver/chromedriver.exe', options=options)
 
+# Lean render: only the text is needed, so images, fonts, CSS and tracking
+# scripts are not downloaded
+enable_lean_render(driver)
+
 driver.get('https://quotes.toscrape.com/js/')
 
 try:
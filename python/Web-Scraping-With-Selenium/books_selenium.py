@@ -1,3 +1,7 @@
+import json
+import os
+import threading
+
 import pandas as pd
 from selenium.webdriver import Chrome, ChromeOptions
 from selenium.webdriver.common.by import By
@@ -5,43 +9,95 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
 
+from driver_pool import DriverPool, POOL_SIZE
+from frontier import Frontier
+from lean_render import enable_lean_render
+
 CHROME_DRIVER_PATH = 'c:/WebDrivers/chromedriver.exe'
 HOMEPAGE = "http://books.toscrape.com"
+LEAN_RENDER = True
+# Finished categories are kept here until every category is done, the next
+# run then clears both files and starts over
+FRONTIER_FILE = 'books_frontier.db'
+RESULTS_FILE = 'books_results.jsonl'
 
 
-def get_data(url, categories):
+def create_driver():
     browser_options = ChromeOptions()
     browser_options.headless = True
 
     driver = Chrome(executable_path=CHROME_DRIVER_PATH, options=browser_options)
-    driver.get(url)
     driver.implicitly_wait(10)
+    if LEAN_RENDER:
+        enable_lean_render(driver)
+    return driver
+
+
+def get_category(driver, url, category):
+    driver.get(url)
+    humor = driver.find_element_by_xpath(f'//a[contains(text(),"{category}")]')
+    humor.click()
+
+    try:
+        books = WebDriverWait(driver, 10).until(
+            EC.presence_of_all_elements_located((By.CSS_SELECTOR, '.product_pod'))
+        )
+    except Exception as e:
+        raise e
+
+    data = []
+    for book in books:
+        title = book.find_element_by_css_selector("h3 > a")
+        price = book.find_element_by_css_selector(".price_color")
+        stock = book.find_element_by_css_selector(".instock.availability")
+        data.append({
+            'title': title.get_attribute("title"),
+            'price': price.text,
+            'stock': stock.text,
+            'Category': category
+        })
+    return data
+
+
+def load_results(file_name) -> dict:
+    results = {}
+    if os.path.exists(file_name):
+        with open(file_name, encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                results[record['category']] = record['data']
+    return results
+
+
+def get_data(url, categories, workers=POOL_SIZE):
+    # Each category is scraped by one of the warm browsers in the pool.
+    # Categories finished by an earlier, interrupted run are not scraped again.
+    lock = threading.Lock()
+    with Frontier(FRONTIER_FILE) as frontier:
+        frontier.release()
+        resume = frontier.unfinished() > 0
+        if not resume:
+            frontier.reset()  # the last run completed, its rows are replaced
+        frontier.add_many(categories)
+        results_file = open(RESULTS_FILE, "a" if resume else "w", encoding="utf-8")
+        todo = frontier.get(len(categories))
+
+        def scrape(driver, category):
+            data = get_category(driver, url, category)
+            with lock:
+                results_file.write(json.dumps({'category': category, 'data': data}) + "\n")
+                results_file.flush()
+            frontier.done(category)
+
+        with results_file:
+            if todo:
+                with DriverPool(size=min(workers, len(todo)), factory=create_driver) as pool:
+                    pool.map(scrape, todo)
+
+    results = load_results(RESULTS_FILE)
     data = []
     for category in categories:
-        humor = driver.find_element_by_xpath(f'//a[contains(text(),{category})]')
-        humor.click()
-
-        try:
-            books = WebDriverWait(driver, 10).until(
-                EC.presence_of_all_elements_located((By.CSS_SELECTOR, '.product_pod'))
-            )
-        except Exception as e:
-            raise e
-
-        for book in books:
-            title = book.find_element_by_css_selector("h3 > a")
-            price = book.find_element_by_css_selector(".price_color")
-            stock = book.find_element_by_css_selector(".instock.availability")
-            data.append({
-                'title': title.get_attribute("title"),
-                'price': price.text,
-                'stock': stock.text,
-                'Category': category
-            })
-
-        driver.get(url)
-
-    driver.quit()
+        data.extend(results.get(category, []))
     return data
 
 
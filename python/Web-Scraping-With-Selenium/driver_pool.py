@@ -0,0 +1,110 @@
+# A pool of warm headless browsers shared by worker threads.
+# Browser start-up is paid once per driver instead of once per page; drivers
+# are replaced after MAX_PAGES pages or when they crash.
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from selenium.webdriver import Chrome, ChromeOptions
+from selenium.common.exceptions import WebDriverException
+
+POOL_SIZE = 4
+MAX_PAGES = 50
+
+
+def create_driver():
+    browser_options = ChromeOptions()
+    browser_options.headless = True
+    return Chrome(options=browser_options)
+
+
+class DriverPool:
+    def __init__(self, size=POOL_SIZE, max_pages=MAX_PAGES, factory=create_driver):
+        self.size = size
+        self.max_pages = max_pages
+        self.factory = factory
+        self._idle = queue.Queue()
+        self._pages = {}
+        self._lock = threading.Lock()
+
+        # Start all browsers in parallel, the start-up is the slow part. If one
+        # of them fails, the ones that did start are quit before raising,
+        # because __exit__ is never called when the constructor raises.
+        with ThreadPoolExecutor(max_workers=size) as executor:
+            futures = [executor.submit(self._start) for _ in range(size)]
+        errors = [future.exception() for future in futures if future.exception()]
+        drivers = [future.result() for future in futures if not future.exception()]
+        if errors:
+            for driver in drivers:
+                self._discard(driver)
+            raise errors[0]
+        for driver in drivers:
+            self._idle.put(driver)
+
+    def _start(self):
+        driver = self.factory()
+        with self._lock:
+            self._pages[driver] = 0
+        return driver
+
+    def _discard(self, driver):
+        with self._lock:
+            self._pages.pop(driver, None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _restart(self, driver):
+        # Quits driver and returns a new one. If the new browser does not
+        # start, returns None: an empty slot that is filled on its next use.
+        self._discard(driver)
+        try:
+            return self._start()
+        except Exception:
+            return None
+
+    @contextmanager
+    def driver(self):
+        driver = self._idle.get()
+        if driver is None:
+            try:
+                driver = self._start()
+            except Exception:
+                self._idle.put(None)
+                raise
+        try:
+            yield driver
+        except WebDriverException:
+            # The browser may be in a broken state, never hand it out again
+            self._idle.put(self._restart(driver))
+            raise
+        except BaseException:
+            self._idle.put(driver)
+            raise
+        with self._lock:
+            self._pages[driver] += 1
+            worn_out = self._pages[driver] >= self.max_pages
+        self._idle.put(self._restart(driver) if worn_out else driver)
+
+    def map(self, func, items):
+        # Calls func(driver, item) for every item, in parallel on all drivers
+        def run(item):
+            with self.driver() as driver:
+                return func(driver, item)
+
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            return list(executor.map(run, items))
+
+    def close(self):
+        while not self._idle.empty():
+            driver = self._idle.get()
+            if driver is not None:
+                self._discard(driver)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,33 @@
+# "Lean render" mode for Chrome: the browser never downloads resources that
+# are not needed to read the text of a page.
+BLOCKED_RESOURCE_TYPES = {
+    'image': ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico'],
+    'font': ['*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot'],
+    'stylesheet': ['*.css'],
+    'media': ['*.mp4', '*.webm', '*.mp3', '*.ogg'],
+}
+BLOCKED_DOMAINS = [
+    'google-analytics.com',
+    'googletagmanager.com',
+    'doubleclick.net',
+    'facebook.net',
+]
+
+
+def blocked_url_patterns(resource_types=BLOCKED_RESOURCE_TYPES, domains=BLOCKED_DOMAINS):
+    patterns = []
+    for resource_type in resource_types:
+        patterns.extend(BLOCKED_RESOURCE_TYPES[resource_type])
+    for domain in domains:
+        patterns.append(f'*://{domain}/*')
+        patterns.append(f'*://*.{domain}/*')
+    return patterns
+
+
+def enable_lean_render(driver, resource_types=BLOCKED_RESOURCE_TYPES, domains=BLOCKED_DOMAINS):
+    # Uses the Chrome DevTools Protocol, so it only works with Chrome/Edge.
+    # Call it before driver.get(), the block list applies to all later requests.
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {
+        'urls': blocked_url_patterns(resource_types, domains)
+    })
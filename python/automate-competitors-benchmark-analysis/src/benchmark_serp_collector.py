@@ -0,0 +1,33 @@
+# Collects SERPs for many keywords from the local mock server and reports
+# the throughput. Usage: python benchmark_serp_collector.py [keywords]
+import asyncio
+import sys
+import time
+
+from aiohttp import web
+
+from mock_oxylabs_server import create_app
+from serp_collector import collect_serps
+
+PORT = 8081
+
+
+async def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    runner = web.AppRunner(create_app(job_duration=(0.5, 2.0)))
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", PORT).start()
+
+    keywords = [f"keyword {i}" for i in range(total)]
+    start = time.perf_counter()
+    df = await collect_serps(keywords, "user", "pass", api_url=f"http://127.0.0.1:{PORT}/v1",
+                             concurrency=100, poll_interval=0.5)
+    elapsed = time.perf_counter() - start
+    await runner.cleanup()
+
+    print(f"{total:,} keywords, {len(df):,} organic results in {elapsed:.1f} s "
+          f"({total / elapsed:.0f} keywords/s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,121 @@
+# Typed, columnar replacement for the list_comparison list of lists.
+# Every stage adds its own columns to one DataFrame, with proper dtypes and
+# <NA> for missing values instead of "No data" strings. The table is saved to
+# a Parquet checkpoint after each stage, so a stage can be run on its own and
+# an interrupted run only redoes the rows that are still missing. Each stage
+# imports its own module when it runs, so a stage can be used without the
+# dependencies of the others (mozscape is only needed for the off-page stage).
+import asyncio
+import os
+
+import pandas as pd
+
+from serp_collector import SERP_COLUMNS
+
+CHECKPOINT_FILE = "competitors.parquet"
+
+
+class CompetitorDataset:
+    def __init__(self, df=None):
+        if df is None:
+            df = pd.DataFrame({name: pd.Series(dtype=dtype) for name, dtype in SERP_COLUMNS.items()})
+        self.df = df.reset_index(drop=True)
+
+    @classmethod
+    def load(cls, file_name=CHECKPOINT_FILE):
+        if not os.path.exists(file_name):
+            return cls()
+        return cls(pd.read_parquet(file_name, dtype_backend="numpy_nullable"))
+
+    def save(self, file_name=CHECKPOINT_FILE):
+        # Write next to the checkpoint first, a crash must not corrupt it
+        tmp_name = file_name + ".tmp"
+        self.df.to_parquet(tmp_name, index=False)
+        os.replace(tmp_name, file_name)
+
+    def add_serps(self, serps):
+        serps = serps.reset_index()[list(SERP_COLUMNS)]
+        known = self.df.set_index(["keyword", "rank"]).index
+        new = serps[~serps.set_index(["keyword", "rank"]).index.isin(known)]
+        self.df = pd.concat([self.df, new], ignore_index=True)
+
+    def pending(self, column):
+        # Rows that a stage still has to fill in
+        if column not in self.df:
+            return self.df
+        return self.df[self.df[column].isna()]
+
+    def fill(self, stage_df, on):
+        # Copies the stage columns into the matching rows, joined on `on`
+        stage_df = stage_df.drop_duplicates(on)
+        merged = self.df[on].merge(stage_df, on=on, how="left")
+        for column in [name for name in stage_df.columns if name not in on]:
+            values = merged[column]
+            if column not in self.df:
+                self.df[column] = values.values
+                continue
+            found = values.notna().values
+            self.df.loc[found, column] = values[found].values
+
+    def to_excel(self, file_name):
+        df = self.df.copy()
+        if "paragraphs" in df:
+            df["paragraphs"] = df["paragraphs"].map(
+                lambda paragraphs: "\n".join(paragraphs) if paragraphs is not None else None
+            )
+        df.to_excel(file_name, header=True, index=False)
+
+
+async def run_serp_stage(dataset, keywords, username, password):
+    from serp_collector import collect_serps
+
+    known = set(dataset.df["keyword"])
+    missing = [keyword for keyword in keywords if keyword not in known]
+    if missing:
+        dataset.add_serps(await collect_serps(missing, username, password))
+
+
+async def run_on_page_stage(dataset):
+    from on_page_analyzer import analyze_pages
+
+    rows = dataset.pending("metatitle")
+    if len(rows):
+        on_page = await analyze_pages(list(zip(rows["keyword"], rows["url"], rows["title"])))
+        dataset.fill(on_page.drop(columns="metatitle_serp"), on=["keyword", "url"])
+
+
+async def run_page_speed_stage(dataset, key):
+    from page_speed_client import page_speed_metrics
+
+    urls = list(dict.fromkeys(dataset.pending("overall_score")["url"]))
+    if urls:
+        dataset.fill(await page_speed_metrics(urls, key), on=["url"])
+
+
+async def run_off_page_stage(dataset, username, password):
+    from moz_metrics import off_page_metrics
+
+    urls = list(dict.fromkeys(dataset.pending("domain_authority")["url"]))
+    if urls:
+        dataset.fill(await off_page_metrics(urls, username, password), on=["url"])
+
+
+async def main():
+    keywords = ["<your_keyword>"]
+    dataset = CompetitorDataset.load()
+
+    # Saved after every stage, so a failed stage does not lose the earlier ones
+    await run_serp_stage(dataset, keywords, "<your_username>", "<your_password>")
+    dataset.save()
+    await run_on_page_stage(dataset)
+    dataset.save()
+    await run_page_speed_stage(dataset, "<your page speed key>")
+    dataset.save()
+    await run_off_page_stage(dataset, "<MOZ username>", "<MOZ password>")
+    dataset.save()
+
+    dataset.to_excel("<filename>.xlsx")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,35 +1,50 @@
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+
+from retry import CircuitOpen, Retrier, RetryableStatus, check_status
+
+strainer = SoupStrainer(["title", "meta", "h1", "p"])
+retrier = Retrier(retry_on=(requests.ConnectionError, requests.Timeout))
+
+
+def fetch(url):
+    html = requests.request("get", url, timeout=30)
+    check_status(html.status_code, html.headers)
+    return html
+
 
 for y in list_comparison:
+    print("Scraping: " + y[0])
     try:
-        print("Scraping: " + y[0])
-        html = requests.request("get", y[0])
-        soup = BeautifulSoup(html.text)
-
-        try:
-            metatitle = (soup.find("title")).get_text()
-        except Exception:
-            metatitle = ""
-
-        try:
-            metadescription = soup.find("meta", attrs={"name": "description"})["content"]
-        except Exception:
-             metadescription = ""
-
-        try:
-            h1 = soup.find("h1").get_text()
-        except Exception:
-            h1 = ""
-
-        paragraph = [a.get_text() for a in soup.find_all('p')]
-        text_length = sum(len(a) for a in paragraph)
-        text_counter = sum(a.lower().count(keyword) for a in paragraph)
-        metatitle_occurrence = keyword in metatitle.lower()
-        h1_occurrence = keyword in h1.lower()
-        metatitle_equal = metatitle == y[1]        
-        y.extend([metatitle, metatitle_equal, metadescription, h1, paragraph, text_length, text_counter, metatitle_occurrence, h1_occurrence])
-
-    except Exception as e:
+        html = retrier.call(y[0], fetch)
+    except (requests.RequestException, RetryableStatus, CircuitOpen) as e:
         print(e)
-        y.extend(["No data"]*9)
\ No newline at end of file
+        y.extend(["No data"]*9)
+        continue
+
+    soup = BeautifulSoup(html.text, "lxml", parse_only=strainer)
+
+    try:
+        metatitle = (soup.find("title")).get_text()
+    except AttributeError:
+        metatitle = ""
+
+    try:
+        metadescription = soup.find("meta", attrs={"name": "description"})["content"]
+    except (TypeError, KeyError):
+         metadescription = ""
+
+    try:
+        h1 = soup.find("h1").get_text()
+    except AttributeError:
+        h1 = ""
+
+    paragraph = [a.get_text() for a in soup.find_all('p')]
+    text_length = sum(len(a) for a in paragraph)
+    text_counter = sum(a.lower().count(keyword) for a in paragraph)
+    metatitle_occurrence = keyword in metatitle.lower()
+    h1_occurrence = keyword in h1.lower()
+    metatitle_equal = metatitle == y[1]        
+    y.extend([metatitle, metatitle_equal, metadescription, h1, paragraph, text_length, text_counter, metatitle_occurrence, h1_occurrence])
+
+print(retrier.summary())
\ No newline at end of file
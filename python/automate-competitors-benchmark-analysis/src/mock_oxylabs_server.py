@@ -0,0 +1,54 @@
+# Local stand-in for the batch queries API, to benchmark serp_collector.py
+# without sending real requests:
+#   python mock_oxylabs_server.py
+#   collect_serps(keywords, "user", "pass", api_url="http://localhost:8081/v1")
+import itertools
+import random
+import time
+
+from aiohttp import web
+
+JOB_DURATION_IN_SECONDS = (1.0, 5.0)
+RESULTS_PER_PAGE = 10
+
+
+def create_app(job_duration=JOB_DURATION_IN_SECONDS):
+    jobs = {}
+    ids = itertools.count(1)
+
+    async def create_batch(request):
+        payload = await request.json()
+        queries = []
+        for keyword in payload["query"]:
+            job_id = str(next(ids))
+            jobs[job_id] = (keyword, time.monotonic() + random.uniform(*job_duration))
+            queries.append({"id": job_id, "query": keyword, "status": "pending"})
+        return web.json_response({"queries": queries})
+
+    async def job_status(request):
+        job = jobs.get(request.match_info["job_id"])
+        if job is None:
+            return web.json_response({"message": "Job not found"}, status=404)
+        status = "done" if time.monotonic() >= job[1] else "pending"
+        return web.json_response({"id": request.match_info["job_id"], "status": status})
+
+    async def job_results(request):
+        job = jobs.get(request.match_info["job_id"])
+        if job is None or time.monotonic() < job[1]:
+            return web.Response(status=204)
+        keyword = job[0]
+        organic = [
+            {"pos": pos, "url": f"https://example{pos}.com/{keyword}", "title": f"{keyword} result {pos}"}
+            for pos in range(1, RESULTS_PER_PAGE + 1)
+        ]
+        return web.json_response({"results": [{"content": {"results": {"organic": organic}}}]})
+
+    app = web.Application()
+    app.router.add_post("/v1/queries/batch", create_batch)
+    app.router.add_get("/v1/queries/{job_id}", job_status)
+    app.router.add_get("/v1/queries/{job_id}/results", job_results)
+    return app
+
+
+if __name__ == "__main__":
+    web.run_app(create_app(), port=8081)
@@ -0,0 +1,55 @@
+# Local stand-in for the runPagespeed endpoint, to try page_speed_client.py
+# without using the real quota:
+#   python mock_pagespeed_server.py
+#   PageSpeedClient(key, api_url="http://localhost:8080/pagespeedonline/v5/runPagespeed")
+import asyncio
+import random
+import time
+
+from aiohttp import web
+
+LATENCY_IN_SECONDS = (0.5, 2.0)
+QUERIES_PER_SECOND = 4
+MISSING_FIELD_RATE = 0.2
+
+
+def fake_result():
+    metrics = {
+        "FIRST_CONTENTFUL_PAINT_MS": {"percentile": random.randint(500, 4000)},
+        "FIRST_INPUT_DELAY_MS": {"percentile": random.randint(5, 300)},
+        "LARGEST_CONTENTFUL_PAINT_MS": {"percentile": random.randint(1000, 6000)},
+        "CUMULATIVE_LAYOUT_SHIFT_SCORE": {"percentile": random.randint(0, 50)},
+    }
+    # Real responses often lack field data for low traffic pages
+    if random.random() < MISSING_FIELD_RATE:
+        metrics = {}
+    return {
+        "loadingExperience": {"metrics": metrics},
+        "lighthouseResult": {"categories": {"performance": {"score": round(random.random(), 2)}}},
+    }
+
+
+def create_app():
+    calls = []
+
+    async def run_pagespeed(request):
+        if "url" not in request.query or "key" not in request.query:
+            return web.json_response({"error": {"code": 400}}, status=400)
+
+        # Same kind of quota as the real API: calls within the last second
+        now = time.monotonic()
+        calls[:] = [t for t in calls if now - t < 1]
+        if len(calls) >= QUERIES_PER_SECOND:
+            return web.json_response({"error": {"code": 429}}, status=429)
+        calls.append(now)
+
+        await asyncio.sleep(random.uniform(*LATENCY_IN_SECONDS))
+        return web.json_response(fake_result())
+
+    app = web.Application()
+    app.router.add_get("/pagespeedonline/v5/runPagespeed", run_pagespeed)
+    return app
+
+
+if __name__ == "__main__":
+    web.run_app(create_app(), port=8080)
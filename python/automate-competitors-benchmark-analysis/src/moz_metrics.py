@@ -0,0 +1,133 @@
+# Batched version of off_page_metrics.py.
+# Mozscape.urlMetrics accepts a list of URLs and fetches them in one request,
+# so the whole keyword set needs a few batched calls instead of one per URL.
+# Calls are spaced by a token bucket at the documented rate. Network errors,
+# 429s and 5xx answers are retried by the Retrier from retry.py, anything else
+# (a 401, a changed response) is raised. Results are cached on disk for
+# CACHE_TTL_IN_SECONDS.
+import asyncio
+import json
+import os
+import time
+from urllib.error import HTTPError
+
+import pandas as pd
+from mozscape import Mozscape
+
+from rate_limit import TokenBucket
+from retry import RETRY_STATUSES, Retrier, RetryableStatus, parse_retry_after
+
+BATCH_SIZE = 10  # URLs per url-metrics request
+SECONDS_PER_CALL = 10  # free access: one request every ten seconds
+MAX_RETRIES = 5
+CACHE_FILE = "moz_cache.json"
+CACHE_TTL_IN_SECONDS = 24 * 60 * 60
+MOZ_API_URL = "https://lsapi.seomoz.com"  # the host the retrier keeps a circuit breaker for
+
+OFF_PAGE_COLUMNS = {
+    "url": "string",
+    "equity_backlinks": "Int64",
+    "total_backlinks": "Int64",
+    "domain_authority": "Float64",
+}
+
+
+def load_cache(file_name):
+    if not os.path.exists(file_name):
+        return {}
+    with open(file_name) as f:
+        return json.load(f)
+
+
+def save_cache(cache, file_name):
+    with open(file_name, "w") as f:
+        json.dump(cache, f)
+
+
+def is_fresh(entry, now, ttl=CACHE_TTL_IN_SECONDS) -> bool:
+    # Entries written before timestamps were stored count as expired
+    return now - entry.get("fetched_at", 0) < ttl
+
+
+def parse_metrics(metrics) -> dict:
+    return {
+        "equity_backlinks": metrics.get("ueid"),
+        "total_backlinks": metrics.get("uid"),
+        "domain_authority": metrics.get("pda"),
+    }
+
+
+def retryable_error(error):
+    # The Mozscape client wraps the urllib error in MozscapeError.value.
+    # Returns the exception the Retrier should see, or None if it must not be
+    # retried.
+    cause = getattr(error, "value", error)
+    if isinstance(cause, HTTPError):
+        if cause.code in RETRY_STATUSES:
+            return RetryableStatus(cause.code, parse_retry_after(cause.headers.get("Retry-After")))
+        return None
+    if isinstance(cause, OSError):  # URLError, timeouts, connection resets
+        return cause
+    return None
+
+
+def create_retrier(seconds_per_call=SECONDS_PER_CALL) -> Retrier:
+    return Retrier(retry_on=(OSError,), attempts=MAX_RETRIES + 1,
+                   base_delay=seconds_per_call, max_delay=seconds_per_call * 2 ** MAX_RETRIES)
+
+
+async def fetch_batch(client, bucket, retrier, urls):
+    async def request(api_url):
+        await bucket.acquire()
+        print(f"Getting MOZ results for {len(urls)} URLs")
+        try:
+            # The client is blocking, keep it off the event loop
+            return await asyncio.to_thread(client.urlMetrics, urls)
+        except Exception as e:
+            retryable = retryable_error(e)
+            if retryable is None:
+                raise
+            raise retryable from e
+
+    try:
+        return await retrier.call_async(MOZ_API_URL, request)
+    except retrier.errors as e:
+        print(f"Giving up on batch: {e!r}")
+        return None
+
+
+async def off_page_metrics(urls, username, password, batch_size=BATCH_SIZE,
+                           seconds_per_call=SECONDS_PER_CALL, cache_file=CACHE_FILE):
+    client = Mozscape(username, password)
+    bucket = TokenBucket(1 / seconds_per_call, capacity=1)
+    retrier = create_retrier(seconds_per_call)
+    cache = load_cache(cache_file)
+
+    now = time.time()
+    missing = [url for url in dict.fromkeys(urls)
+               if url not in cache or not is_fresh(cache[url], now)]
+    for start in range(0, len(missing), batch_size):
+        batch = missing[start:start + batch_size]
+        results = await fetch_batch(client, bucket, retrier, batch)
+        if results is None:
+            continue
+        for url, metrics in zip(batch, results):
+            cache[url] = {**parse_metrics(metrics), "fetched_at": time.time()}
+        save_cache(cache, cache_file)
+    if retrier.report:
+        print(retrier.summary())
+
+    # Expired entries are left empty rather than served, the next run fetches them again
+    rows = [{"url": url, **(cache[url] if url in cache and is_fresh(cache[url], now) else {})}
+            for url in urls]
+    columns = {name: [row.get(name) for row in rows] for name in OFF_PAGE_COLUMNS}
+    return pd.DataFrame(columns).astype(OFF_PAGE_COLUMNS)
+
+
+if __name__ == "__main__":
+    list_comparison = [
+        ["https://example.com/result/example-link", "Example Link - Example"],
+    ]
+    df = asyncio.run(off_page_metrics([y[0] for y in list_comparison],
+                                      "<MOZ username>", "<MOZ password>"))
+    print(df)
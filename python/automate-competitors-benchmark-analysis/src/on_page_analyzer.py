@@ -0,0 +1,115 @@
+# Concurrent version of get_top_urls.py for many keywords at once.
+# Pages are downloaded with aiohttp, parsed in a process pool and every
+# metric is computed in a single pass over the paragraphs.
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import aiohttp
+import pandas as pd
+from bs4 import BeautifulSoup, SoupStrainer
+
+from retry import Retrier, check_status
+
+FETCH_CONCURRENCY = 50
+TIMEOUT_IN_SECONDS = 30
+
+# The analysis only reads these tags, nothing else is turned into a tree
+ON_PAGE_STRAINER = SoupStrainer(["title", "meta", "h1", "p"])
+
+ON_PAGE_COLUMNS = {
+    "keyword": "string",
+    "url": "string",
+    "metatitle_serp": "string",
+    "metatitle": "string",
+    "metatitle_equal": "boolean",
+    "metadescription": "string",
+    "h1": "string",
+    "paragraphs": "object",
+    "text_length": "Int64",
+    "keyword_occurrences": "Int64",
+    "metatitle_occurrence": "boolean",
+    "h1_occurrence": "boolean",
+}
+
+
+def analyze_html(html, keyword, serp_title) -> dict:
+    soup = BeautifulSoup(html, "lxml", parse_only=ON_PAGE_STRAINER)
+    keyword = keyword.lower()
+
+    title = soup.find("title")
+    metatitle = title.get_text() if title else ""
+    description = soup.find("meta", attrs={"name": "description"})
+    metadescription = description.get("content", "") if description else ""
+    h1 = soup.find("h1")
+    h1 = h1.get_text() if h1 else ""
+
+    paragraphs = []
+    text_length = 0
+    text_counter = 0
+    for p in soup.find_all("p"):
+        text = p.get_text()
+        paragraphs.append(text)
+        text_length += len(text)
+        text_counter += text.lower().count(keyword)
+
+    return {
+        "metatitle": metatitle,
+        "metatitle_equal": metatitle == serp_title,
+        "metadescription": metadescription,
+        "h1": h1,
+        "paragraphs": paragraphs,
+        "text_length": text_length,
+        "keyword_occurrences": text_counter,
+        "metatitle_occurrence": keyword in metatitle.lower(),
+        "h1_occurrence": keyword in h1.lower(),
+    }
+
+
+async def fetch_html(url, session, semaphore):
+    # The semaphore is only held during a request, not while backing off
+    async with semaphore:
+        print("Scraping: " + url)
+        async with session.get(url) as response:
+            check_status(response.status, response.headers)
+            return await response.text(errors="replace")
+
+
+async def analyze_page(session, semaphore, pool, retrier, keyword, url, serp_title):
+    row = {"keyword": keyword, "url": url, "metatitle_serp": serp_title}
+    try:
+        html = await retrier.call_async(url, fetch_html, session, semaphore)
+        loop = asyncio.get_running_loop()
+        row.update(await loop.run_in_executor(pool, analyze_html, html, keyword, serp_title))
+    except Exception as e:
+        # Metrics stay empty (<NA>) for pages that could not be scraped
+        print(f"{url}: {e}")
+    return row
+
+
+async def analyze_pages(serp_rows, concurrency=FETCH_CONCURRENCY, parse_workers=None):
+    # serp_rows: (keyword, url, serp_title) tuples
+    semaphore = asyncio.Semaphore(concurrency)
+    # Retries with backoff, and stops sending requests to hosts that keep failing
+    retrier = Retrier(retry_on=(aiohttp.ClientConnectionError, asyncio.TimeoutError))
+    timeout = aiohttp.ClientTimeout(total=TIMEOUT_IN_SECONDS)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    with ProcessPoolExecutor(max_workers=parse_workers or os.cpu_count()) as pool:
+        async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+            rows = await asyncio.gather(*[
+                analyze_page(session, semaphore, pool, retrier, keyword, url, serp_title)
+                for keyword, url, serp_title in serp_rows
+            ])
+    print(retrier.summary())
+
+    columns = {name: [row.get(name) for row in rows] for name in ON_PAGE_COLUMNS}
+    return pd.DataFrame(columns).astype(ON_PAGE_COLUMNS)
+
+
+if __name__ == "__main__":
+    keyword = "<your_keyword>"
+    list_comparison = [
+        ["https://example.com/result/example-link", "Example Link - Example"],
+    ]
+    df = asyncio.run(analyze_pages([(keyword, url, title) for url, title in list_comparison]))
+    print(df)
@@ -0,0 +1,158 @@
+# Concurrent version of page_speed_metrics.py.
+# Calls are spread out with a token bucket that matches the API quota, and
+# results are cached per (url, strategy, day) so a re-run only asks for URLs
+# that have not been scored yet today.
+import asyncio
+import json
+import sqlite3
+from datetime import date
+
+import aiohttp
+import pandas as pd
+
+from rate_limit import TokenBucket
+
+PAGESPEED_URL = "https://www.googleapis.com/pagespeedonline/v5/runPagespeed"
+QUERIES_PER_SECOND = 4  # default quota: 400 queries per 100 seconds
+CONCURRENCY = 20
+TIMEOUT_IN_SECONDS = 120
+MAX_RETRIES = 3
+CACHE_FILE = "pagespeed_cache.sqlite"
+
+PAGE_SPEED_COLUMNS = {
+    "url": "string",
+    "strategy": "string",
+    "fcp": "Float64",
+    "fid": "Float64",
+    "lcp": "Float64",
+    "cls": "Float64",
+    "overall_score": "Float64",
+}
+
+
+def get_path(data, *keys):
+    for key in keys:
+        if not isinstance(data, dict) or key not in data:
+            return None
+        data = data[key]
+    return data
+
+
+def get_metric(data, name, divide_by=1):
+    value = get_path(data, "loadingExperience", "metrics", name, "percentile")
+    if not isinstance(value, (int, float)):
+        return None
+    return value / divide_by
+
+
+def parse_result(data) -> dict:
+    score = get_path(data, "lighthouseResult", "categories", "performance", "score")
+    return {
+        "fcp": get_metric(data, "FIRST_CONTENTFUL_PAINT_MS", 1000),
+        "fid": get_metric(data, "FIRST_INPUT_DELAY_MS", 1000),
+        "lcp": get_metric(data, "LARGEST_CONTENTFUL_PAINT_MS"),
+        "cls": get_metric(data, "CUMULATIVE_LAYOUT_SHIFT_SCORE", 100),
+        "overall_score": score * 100 if isinstance(score, (int, float)) else None,
+    }
+
+
+class ResultCache:
+    def __init__(self, file_name=CACHE_FILE):
+        self.connection = sqlite3.connect(file_name)
+        self.connection.execute(
+            "create table if not exists results ("
+            " url text, strategy text, day text, result text,"
+            " primary key (url, strategy, day))"
+        )
+
+    def get(self, url, strategy, day):
+        row = self.connection.execute(
+            "select result from results where url = ? and strategy = ? and day = ?",
+            (url, strategy, day),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, url, strategy, day, result):
+        self.connection.execute(
+            "insert or replace into results values (?, ?, ?, ?)",
+            (url, strategy, day, json.dumps(result)),
+        )
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+
+class PageSpeedClient:
+    def __init__(self, key, api_url=PAGESPEED_URL, queries_per_second=QUERIES_PER_SECOND,
+                 concurrency=CONCURRENCY, cache_file=CACHE_FILE):
+        self.key = key
+        self.api_url = api_url
+        # No bursts, calls are spread evenly over the quota window
+        self.bucket = TokenBucket(queries_per_second, capacity=1)
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.cache = ResultCache(cache_file)
+
+    async def get_metrics(self, session, url, strategy):
+        day = date.today().isoformat()
+        cached = self.cache.get(url, strategy, day)
+        if cached is not None:
+            return cached
+
+        params = {"url": url, "strategy": strategy, "locale": "en", "key": self.key}
+        data = None
+        try:
+            async with self.semaphore:
+                for attempt in range(MAX_RETRIES + 1):
+                    await self.bucket.acquire()
+                    print("Getting results for: " + url)
+                    async with session.get(self.api_url, params=params) as response:
+                        if response.status == 429 and attempt < MAX_RETRIES:
+                            # Over quota anyway, wait for the window to pass
+                            await asyncio.sleep(2 ** attempt)
+                            continue
+                        if response.status == 200:
+                            data = await response.json(content_type=None)
+                        else:
+                            print(f"{url}: HTTP {response.status}")
+                        break
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            print(f"{url}: {e}")
+        if data is None:
+            return parse_result({})
+
+        # Only successful responses are cached, failures are retried next run
+        result = parse_result(data)
+        self.cache.put(url, strategy, day, result)
+        return result
+
+    async def run(self, urls, strategy="mobile"):
+        timeout = aiohttp.ClientTimeout(total=TIMEOUT_IN_SECONDS)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            results = await asyncio.gather(*[
+                self.get_metrics(session, url, strategy) for url in urls
+            ])
+
+        rows = [{"url": url, "strategy": strategy, **result} for url, result in zip(urls, results)]
+        columns = {name: [row[name] for row in rows] for name in PAGE_SPEED_COLUMNS}
+        return pd.DataFrame(columns).astype(PAGE_SPEED_COLUMNS)
+
+    def close(self):
+        self.cache.close()
+
+
+async def page_speed_metrics(urls, key, strategy="mobile", **kwargs):
+    client = PageSpeedClient(key, **kwargs)
+    try:
+        return await client.run(urls, strategy)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    pagespeed_key = "<your page speed key>"
+    list_comparison = [
+        ["https://example.com/result/example-link", "Example Link - Example"],
+    ]
+    df = asyncio.run(page_speed_metrics([y[0] for y in list_comparison], pagespeed_key))
+    print(df)
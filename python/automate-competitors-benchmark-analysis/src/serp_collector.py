@@ -0,0 +1,147 @@
+# Batched version of get_serp.py for thousands of keywords.
+# Keywords are submitted through the batch queries endpoint (as in
+# oxylabs.Client.create_jobs), then the jobs are polled and their results
+# downloaded concurrently.
+import asyncio
+
+import aiohttp
+import pandas as pd
+
+from retry import Retrier, check_status
+
+API_URL = "https://data.oxylabs.io/v1"
+BATCH_SIZE = 1000  # keywords per batch request
+CONCURRENCY = 50
+POLL_INTERVAL_IN_SECONDS = 5
+MAX_WAIT_IN_SECONDS = 600  # a job that is not done by then counts as failed
+MAX_ATTEMPTS = 3  # per request, for 5xx answers, connection errors and timeouts
+RETRY_DELAY_IN_SECONDS = 1  # doubled after every failed attempt
+JOB_STATUS_DONE = "done"
+JOB_STATUS_FAULTED = "faulted"
+
+SERP_COLUMNS = {
+    "keyword": "string",
+    "rank": "Int64",
+    "url": "string",
+    "title": "string",
+}
+
+
+def create_retrier() -> Retrier:
+    return Retrier(retry_on=(aiohttp.ClientConnectionError, asyncio.TimeoutError))
+
+
+async def post_batch(url, session, payload):
+    async with session.post(url, json=payload) as response:
+        check_status(response.status, response.headers)
+        response.raise_for_status()
+        data = await response.json()
+    return [(job["query"], job["id"]) for job in data["queries"]]
+
+
+async def submit_batch(session, retrier, api_url, keywords):
+    # 429s, 5xx and connection errors are retried. A request that timed out
+    # may still have created its jobs, so a retry can submit a keyword twice.
+    payload = {
+        "source": "SEARCH_ENGINE_search",
+        "domain": "com",
+        "query": keywords,
+        "parse": True,
+    }
+    return await retrier.call_async(f"{api_url}/queries/batch", post_batch, session, payload)
+
+
+class JobFailed(Exception):
+    pass
+
+
+async def get_json(session, semaphore, url, attempts=MAX_ATTEMPTS):
+    # 5xx answers, connection errors and timeouts are retried. Any other answer
+    # that is not 200 with a JSON body (4xx, 204 No Content) fails at once.
+    for attempt in range(attempts):
+        if attempt:
+            await asyncio.sleep(RETRY_DELAY_IN_SECONDS * 2 ** (attempt - 1))
+        try:
+            # The semaphore limits open requests, not jobs that are waiting to poll again
+            async with semaphore:
+                async with session.get(url) as response:
+                    if response.status >= 500:
+                        error = f"HTTP {response.status}"
+                        continue
+                    if response.status != 200:
+                        raise JobFailed(f"HTTP {response.status} from {url}")
+                    try:
+                        return await response.json()
+                    except (aiohttp.ContentTypeError, ValueError):
+                        raise JobFailed(f"No JSON in the answer from {url}")
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            error = repr(e)
+    raise JobFailed(f"{url} failed {attempts} times, last error: {error}")
+
+
+async def collect_job(session, semaphore, api_url, keyword, job_id, poll_interval, max_wait):
+    # Returns the organic results of one keyword, or [] if its job failed or
+    # did not finish within max_wait seconds, so that one bad job does not
+    # lose the results of all the others
+    deadline = asyncio.get_running_loop().time() + max_wait
+    try:
+        while True:
+            status = (await get_json(session, semaphore, f"{api_url}/queries/{job_id}"))["status"]
+            if status == JOB_STATUS_DONE:
+                break
+            if status == JOB_STATUS_FAULTED:
+                print(f"Job for '{keyword}' failed")
+                return []
+            if asyncio.get_running_loop().time() >= deadline:
+                raise JobFailed(f"still {status} after {max_wait} seconds")
+            await asyncio.sleep(poll_interval)
+
+        data = await get_json(session, semaphore, f"{api_url}/queries/{job_id}/results")
+        organic = data["results"][0]["content"]["results"].get("organic", [])
+    except (JobFailed, KeyError, IndexError, TypeError, AttributeError) as e:
+        print(f"Job for '{keyword}' failed: {e!r}")
+        return []
+    return [
+        {"keyword": keyword, "rank": x.get("pos", i + 1), "url": x.get("url"), "title": x.get("title")}
+        for i, x in enumerate(organic)
+    ]
+
+
+async def collect_serps(keywords, username, password, api_url=API_URL, batch_size=BATCH_SIZE,
+                        concurrency=CONCURRENCY, poll_interval=POLL_INTERVAL_IN_SECONDS,
+                        max_wait=MAX_WAIT_IN_SECONDS):
+    semaphore = asyncio.Semaphore(concurrency)
+    retrier = create_retrier()
+    auth = aiohttp.BasicAuth(username, password)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(auth=auth, connector=connector) as session:
+        # A batch that still fails is skipped, the jobs of the other batches
+        # are already paid for and are collected anyway
+        batches = [keywords[start:start + batch_size] for start in range(0, len(keywords), batch_size)]
+        submitted = await asyncio.gather(*[
+            submit_batch(session, retrier, api_url, batch) for batch in batches
+        ], return_exceptions=True)
+        jobs = []
+        for batch, batch_jobs in zip(batches, submitted):
+            if isinstance(batch_jobs, Exception):
+                print(f"Batch of {len(batch)} keywords starting with '{batch[0]}' failed: {batch_jobs!r}")
+                continue
+            jobs.extend(batch_jobs)
+        print(f"Submitted {len(jobs)} jobs")
+        print(retrier.summary())
+
+        results = await asyncio.gather(*[
+            collect_job(session, semaphore, api_url, keyword, job_id, poll_interval, max_wait)
+            for keyword, job_id in jobs
+        ])
+
+    rows = [row for job_rows in results for row in job_rows]
+    columns = {name: [row[name] for row in rows] for name in SERP_COLUMNS}
+    df = pd.DataFrame(columns).astype(SERP_COLUMNS)
+    return df.set_index(["keyword", "rank"]).sort_index()
+
+
+if __name__ == "__main__":
+    keywords = ["<your_keyword>", "<another_keyword>"]
+    df = asyncio.run(collect_serps(keywords, "<your_username>", "<your_password>"))
+    print(df)
@@ -0,0 +1,159 @@
+# Waits for Oxylabs jobs in the Airflow triggerer instead of a worker.
+# OxylabsJobsOperator takes a batch of pending jobs from the queue and defers
+# to OxylabsJobsTrigger, which gives the worker slot back. The trigger checks
+# the status of all the jobs together from the triggerer's event loop, so one
+# triggerer can wait for thousands of jobs. Once every job has finished (or
+# max_wait has passed since the task started) the task resumes on a worker,
+# fetches the results and updates the queue.
+import asyncio
+import os
+import sys
+import time
+from pprint import pprint
+
+import aiohttp
+from airflow.models import BaseOperator
+from airflow.triggers.base import BaseTrigger, TriggerEvent
+
+SRC_DIR = '/opt/airflow/src'
+
+STATUS_URL = 'https://data.oxylabs.io/v1/queries/%s'
+JOB_STATUS_PENDING = 'pending'
+JOB_STATUS_DONE = 'done'
+JOB_STATUS_DELETED = 'deleted'
+JOB_STATUS_FAULTED = 'faulted'
+
+HTTP_NOT_FOUND = 404
+
+BATCH_SIZE = 1000
+POLL_INTERVAL = 10  # seconds between two checks of the same job, as in Queue.pull()
+MAX_WAIT = 600  # seconds before the task resumes with the jobs that have finished so far
+CONCURRENCY = 20  # status requests in flight at once
+LEASE_MARGIN = 300  # seconds to hand the task to the triggerer and back
+
+
+class OxylabsJobsTrigger(BaseTrigger):
+    def __init__(self, job_ids, end_time, poll_interval=POLL_INTERVAL, concurrency=CONCURRENCY):
+        # end_time is a wall clock timestamp, so a trigger that is restarted,
+        # e.g. by another triggerer, keeps the original deadline
+        super().__init__()
+        self.job_ids = job_ids
+        self.end_time = end_time
+        self.poll_interval = poll_interval
+        self.concurrency = concurrency
+
+    def serialize(self):
+        # The credentials are read from the environment in run(), so they are
+        # not stored in Airflow's database together with the trigger
+        return 'oxylabs_jobs.OxylabsJobsTrigger', {
+            'job_ids': self.job_ids,
+            'end_time': self.end_time,
+            'poll_interval': self.poll_interval,
+            'concurrency': self.concurrency,
+        }
+
+    async def run(self):
+        auth = aiohttp.BasicAuth(
+            os.getenv('OXYLABS_USERNAME', 'your-oxylabs-username'),
+            os.getenv('OXYLABS_PASSWORD', 'your-oxylabs-password'),
+        )
+        timeout = aiohttp.ClientTimeout(total=30)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        pending = list(self.job_ids)
+        finished = {}
+
+        async with aiohttp.ClientSession(auth=auth, timeout=timeout) as session:
+            while True:
+                statuses = await asyncio.gather(*[
+                    self.get_status(session, semaphore, job_id) for job_id in pending
+                ])
+                for job_id, status in zip(pending, statuses):
+                    if status not in (None, JOB_STATUS_PENDING):
+                        finished[job_id] = status
+                pending = [job_id for job_id in pending if job_id not in finished]
+
+                if not pending or time.time() >= self.end_time:
+                    break
+                self.log.info('%d of %d jobs finished, waiting', len(finished), len(self.job_ids))
+                await asyncio.sleep(self.poll_interval)
+
+        yield TriggerEvent({'finished': finished, 'pending': pending})
+
+    async def get_status(self, session, semaphore, job_id):
+        # None if the status could not be read, the job is checked again later
+        async with semaphore:
+            try:
+                async with session.get(STATUS_URL % job_id) as response:
+                    if response.status == HTTP_NOT_FOUND:
+                        return JOB_STATUS_DELETED
+                    response.raise_for_status()
+                    job_status_data = await response.json()
+                    return job_status_data['status']
+            except (aiohttp.ClientError, asyncio.TimeoutError, KeyError) as e:
+                self.log.warning('Could not check job %s: %r', job_id, e)
+                return None
+
+
+def load_bootstrap():
+    # The pipeline code lives next to the DAGs, in the src folder
+    if SRC_DIR not in sys.path:
+        sys.path.append(SRC_DIR)
+    import bootstrap
+    return bootstrap
+
+
+class OxylabsJobsOperator(BaseOperator):
+    def __init__(self, batch_size=BATCH_SIZE, poll_interval=POLL_INTERVAL, max_wait=MAX_WAIT,
+                 concurrency=CONCURRENCY, **kwargs):
+        super().__init__(**kwargs)
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_wait = max_wait
+        self.concurrency = concurrency
+
+    def execute(self, context):
+        bootstrap = load_bootstrap()
+        with bootstrap.open_queue() as queue:
+            job_ids = queue.pull_many(self.batch_size, self.max_wait + LEASE_MARGIN)
+        if not job_ids:
+            self.log.info('No jobs left in the queue, exiting')
+            return []
+
+        self.log.info('Waiting for %d jobs', len(job_ids))
+        end_time = time.time() + self.max_wait
+        self.defer(
+            trigger=OxylabsJobsTrigger(job_ids, end_time, self.poll_interval, self.concurrency),
+            method_name='execute_complete',
+        )
+
+    def execute_complete(self, context, event):
+        bootstrap = load_bootstrap()
+        client = bootstrap.get_client()
+        completed, failed, deleted = [], [], []
+        with bootstrap.open_queue() as queue:
+            for job_id, status in event['finished'].items():
+                if status == JOB_STATUS_FAULTED:
+                    self.log.warning('Job %s failed in oxy', job_id)
+                    queue.fail(job_id)
+                    failed.append(job_id)
+                    continue
+
+                content_list = client.fetch_content_list(job_id) if status == JOB_STATUS_DONE else None
+                if content_list is None:
+                    self.log.info('Job %s no longer exists in oxy (%s)', job_id, status)
+                    queue.delete(job_id)
+                    deleted.append(job_id)
+                    continue
+
+                queue.complete(job_id)
+                completed.append(job_id)
+                for content in content_list:
+                    pprint(content)
+
+            # Jobs that are still running go back to the queue for the next run
+            for job_id in event['pending']:
+                queue.touch(job_id)
+
+        self.log.info('%d jobs completed, %d failed, %d no longer exist, %d still pending',
+                      len(completed), len(failed), len(deleted), len(event['pending']))
+        return completed
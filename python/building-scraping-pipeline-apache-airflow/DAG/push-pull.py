@@ -4,6 +4,8 @@ import pendulum
 from airflow import DAG
 from airflow.operators.bash import BashOperator
 
+from oxylabs_jobs import OxylabsJobsOperator
+
 default_args = {
     'owner': 'airflow',
     'depends_on_past': True,
@@ -16,7 +18,7 @@ with DAG(
         schedule_interval='@daily',
         description='Push-Pull workflow',
         start_date=pendulum.datetime(2022, 5, 1, tz='UTC'),
-        dagrun_timeout=timedelta(minutes=1),
+        dagrun_timeout=timedelta(minutes=20),
         tags=['scrape', 'database'],
         catchup=False
 ) as dag:
@@ -25,9 +27,8 @@ with DAG(
         bash_command='python /opt/airflow/src/pusher.py',
     )
 
-    task_pull = BashOperator(
+    task_pull = OxylabsJobsOperator(
         task_id='pull',
-        bash_command='python /opt/airflow/src/puller.py'
     )
 
     task_push.set_downstream(task_pull)
\ No newline at end of file
@@ -5,6 +5,8 @@ from airflow import DAG
 from airflow.operators.bash import BashOperator
 from airflow.operators.python import ShortCircuitOperator
 
+from oxylabs_jobs import OxylabsJobsOperator
+
 default_args = {
     'owner': 'airflow',
     'depends_on_past': True,
@@ -17,7 +19,7 @@ with DAG(
         schedule_interval='* * * * *',
         description='Scrape the website',
         start_date=pendulum.datetime(2022, 5, 1, tz='UTC'),
-        dagrun_timeout=timedelta(minutes=1),
+        dagrun_timeout=timedelta(minutes=20),
         tags=['scrape', 'oxylabs', 'push', 'pull'],
         catchup=False
 ) as dag:
@@ -41,7 +43,8 @@ with DAG(
     )
 
     trigger_once.set_downstream(setup_task)
-def is_midnight(logical_date):
+
+    def is_midnight(logical_date):
         return logical_date.hour == 0 and logical_date.minute == 0
 
     trigger_once_per_day = ShortCircuitOperator(
@@ -57,9 +60,8 @@ def is_midnight(logical_date):
     )
     trigger_once_per_day.set_downstream(task_push)
 
-    task_pull = BashOperator(
+    task_pull = OxylabsJobsOperator(
         task_id='pull',
-        bash_command='python /opt/airflow/src/puller.py'
     )
 
     trigger_always.set_downstream(task_pull)
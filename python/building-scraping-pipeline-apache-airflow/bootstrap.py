@@ -1,6 +1,9 @@
+import atexit
 import os
+import threading
+from contextlib import contextmanager
 
-import psycopg2
+import psycopg2.pool
 
 from messenger import Queue
 from oxylabs import Client
@@ -9,21 +12,65 @@ DB_HOST = os.getenv('DB_HOST', 'postgres')
 DB_USER = os.getenv('DB_USER', 'airflow')
 DB_PASS = os.getenv('DB_PASS', 'airflow')
 DB_NAME = os.getenv('DB_NAME', 'scraper')
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '4'))
 OXYLABS_USERNAME = os.getenv('OXYLABS_USERNAME', 'your-oxylabs-username')
 OXYLABS_PASSWORD = os.getenv('OXYLABS_PASSWORD', 'your-oxylabs-password')
 
-connection = psycopg2.connect(
-    host=DB_HOST,
-    user=DB_USER,
-    password=DB_PASS,
-    database=DB_NAME
-)
-
-queue = Queue(
-    connection
-)
-
-client = Client(
-    OXYLABS_USERNAME,
-    OXYLABS_PASSWORD,
-)
\ No newline at end of file
+# Nothing is connected or created on import, only on first use
+_pool = None
+_client = None
+_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = psycopg2.pool.ThreadedConnectionPool(
+                1,
+                DB_POOL_SIZE,
+                host=DB_HOST,
+                user=DB_USER,
+                password=DB_PASS,
+                database=DB_NAME
+            )
+            atexit.register(close)
+        return _pool
+
+
+@contextmanager
+def open_queue():
+    # Lends a pooled connection to a Queue for the duration of the block. The
+    # transaction is committed when the block ends and rolled back if it
+    # raises, then the connection goes back to the pool.
+    pool = get_pool()
+    connection = pool.getconn()
+    try:
+        yield Queue(connection)
+    except BaseException:
+        connection.rollback()
+        raise
+    else:
+        connection.commit()
+    finally:
+        pool.putconn(connection)
+
+
+def get_client():
+    global _client
+    with _lock:
+        if _client is None:
+            _client = Client(
+                OXYLABS_USERNAME,
+                OXYLABS_PASSWORD,
+            )
+        return _client
+
+
+def close():
+    # Closes all pooled connections, the next open_queue() starts a new pool
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
\ No newline at end of file
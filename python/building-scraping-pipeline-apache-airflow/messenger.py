@@ -1,18 +1,15 @@
-import atexit
-
 import psycopg2.extras
 
 STATUS_PENDING = 'pending'
 STATUS_COMPLETE = 'complete'
 STATUS_DELETED = 'deleted'
+STATUS_FAILED = 'failed'
 
 
 class Queue:
     def __init__(self, connection):
         self.connection = connection
 
-        atexit.register(self.cleanup)
-
     def setup(self):
         cursor = self.connection.cursor()
 
@@ -63,12 +60,39 @@ class Queue:
         )
         return cursor.fetchone()
 
+    def pull_many(self, limit, lease_seconds):
+        # Takes up to `limit` pending jobs at once. Their updated_at is moved
+        # lease_seconds into the future, which hides them from pull() and other
+        # pull_many() calls until they are touched or the lease runs out.
+        cursor = self.connection.cursor()
+        cursor.execute(
+            '''
+            update queue set updated_at = now() + %s * interval '1 second'
+            where id in (
+              select id from queue where status = %s and
+              updated_at < now() - interval '10 second'
+              order by updated_at
+              limit %s
+              for update skip locked
+            )
+            returning job_id
+            ''',
+            [lease_seconds, STATUS_PENDING, limit]
+        )
+        job_ids = [row[0] for row in cursor]
+
+        self.connection.commit()
+        return job_ids
+
     def delete(self, job_id):
         self.__change_status(job_id, STATUS_DELETED)
 
     def complete(self, job_id):
         self.__change_status(job_id, STATUS_COMPLETE)
 
+    def fail(self, job_id):
+        self.__change_status(job_id, STATUS_FAILED)
+
     def touch(self, job_id):
         self.__execute_and_commit(
             'update queue set updated_at = now() where job_id = %s',
@@ -85,7 +109,4 @@ class Queue:
         cursor = self.connection.cursor()
         cursor.execute(sql, val)
 
-        self.connection.commit()
-
-    def cleanup(self):
         self.connection.commit()
\ No newline at end of file
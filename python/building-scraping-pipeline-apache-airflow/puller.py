@@ -1,23 +1,29 @@
 from pprint import pprint
-from bootstrap import queue, client
+from bootstrap import get_client, open_queue
 
-queue_item = queue.pull()
-if not queue_item:
-    print('No jobs left in the queue, exiting')
-    exit(0)
 
-if not client.is_status_done(queue_item['job_id']):
-    queue.touch(queue_item['job_id'])
-    print('Job is not yet finished, skipping')
-    exit(0)
+def pull(queue, client):
+    queue_item = queue.pull()
+    if not queue_item:
+        print('No jobs left in the queue, exiting')
+        return
 
-content_list = client.fetch_content_list(queue_item['job_id'])
-if content_list is None:
-    print('Job no longer exists in oxy')
-    queue.delete(queue_item['job_id'])
-    exit(0)
+    if not client.is_status_done(queue_item['job_id']):
+        queue.touch(queue_item['job_id'])
+        print('Job is not yet finished, skipping')
+        return
 
-queue.complete(queue_item['job_id'])
+    content_list = client.fetch_content_list(queue_item['job_id'])
+    if content_list is None:
+        print('Job no longer exists in oxy')
+        queue.delete(queue_item['job_id'])
+        return
 
-for content in content_list:
-    pprint(content)
\ No newline at end of file
+    queue.complete(queue_item['job_id'])
+
+    for content in content_list:
+        pprint(content)
+
+
+with open_queue() as queue:
+    pull(queue, get_client())
\ No newline at end of file
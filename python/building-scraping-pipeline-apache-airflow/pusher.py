@@ -1,6 +1,6 @@
-from bootstrap import queue, client
+from bootstrap import get_client, open_queue
 
-jobs = client.create_jobs([
+jobs = get_client().create_jobs([
     'https://books.toscrape.com/catalogue/sapiens-a-brief-history-of-humankind_996/index.html',
     'https://books.toscrape.com/catalogue/sharp-objects_997/index.html',
     'https://books.toscrape.com/catalogue/soumission_998/index.html',
@@ -8,6 +8,7 @@ jobs = client.create_jobs([
     'https://books.toscrape.com/catalogue/a-light-in-the-attic_1000/index.html',
 ])
 
-for job in jobs['queries']:
-    queue.push(job['id'])
-    print('job id: %s' % job['id'])
\ No newline at end of file
+with open_queue() as queue:
+    for job in jobs['queries']:
+        queue.push(job['id'])
+        print('job id: %s' % job['id'])
\ No newline at end of file
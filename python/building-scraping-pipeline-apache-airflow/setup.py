@@ -1,5 +1,7 @@
-from bootstrap import queue
+from bootstrap import open_queue
+
+with open_queue() as queue:
+    success = queue.setup()
 
-success = queue.setup()
 if not success:
     exit(1)
\ No newline at end of file
@@ -0,0 +1,229 @@
+# Records HTTP responses to disk and replays them without the network, so an
+# extractor can be changed and re-run over the same pages at disk speed.
+#
+# An archive is a directory with append-only segment files and a SQLite
+# index. Every response is compressed on its own (zstd if the zstandard
+# package is installed, zlib otherwise) and appended to the current segment;
+# the index maps its URL to (segment, offset, length). Replay memory-maps the
+# segments and only decompresses the records that are asked for.
+#
+#   session = open_session("record")   # downloads and saves every response
+#   session = open_session("replay")   # serves the saved responses
+#   session.get(url)                   # the same call in both modes
+import json
+import mmap
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ARCHIVE_DIR = "responses"
+SEGMENT_SIZE = 256 * 1024 * 1024  # a new segment is started after this many bytes
+ZSTD_LEVEL = 3
+
+# The body stored in the archive is already decoded
+SKIPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    segment INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL
+);
+"""
+
+
+class ResponseArchive:
+    def __init__(self, path=ARCHIVE_DIR, mode="r", segment_size=SEGMENT_SIZE):
+        # mode "r" only reads, mode "a" appends new responses
+        self.path = path
+        self.mode = mode
+        self.segment_size = segment_size
+        if mode == "a":
+            os.makedirs(path, exist_ok=True)
+        elif not os.path.exists(os.path.join(path, "index.db")):
+            raise FileNotFoundError(f"No archive in {path}, record one first")
+        self.db = sqlite3.connect(os.path.join(path, "index.db"), check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        self.codec = self._codec()
+        self.lock = threading.Lock()
+        self.local = threading.local()  # zstd contexts cannot be shared by threads
+        self.maps = {}
+        self.segment = None
+        self.file = None
+
+    def _codec(self) -> str:
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'codec'").fetchone()
+        if row is None:
+            codec = "zstd" if zstandard is not None else "zlib"
+            with self.db:
+                self.db.execute("INSERT INTO meta VALUES ('codec', ?)", (codec,))
+            return codec
+        if row[0] == "zstd" and zstandard is None:
+            raise RuntimeError("This archive is zstd-compressed, run: pip install zstandard")
+        return row[0]
+
+    def _compress(self, data) -> bytes:
+        if self.codec == "zstd":
+            if not hasattr(self.local, "compressor"):
+                self.local.compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+            return self.local.compressor.compress(data)
+        return zlib.compress(data)
+
+    def _decompress(self, data) -> bytes:
+        if self.codec == "zstd":
+            if not hasattr(self.local, "decompressor"):
+                self.local.decompressor = zstandard.ZstdDecompressor()
+            return self.local.decompressor.decompress(data)
+        return zlib.decompress(data)
+
+    def _segment_name(self, segment) -> str:
+        return os.path.join(self.path, f"segment-{segment:05d}.{self.codec}")
+
+    def _open_segment(self):
+        if self.file is None:
+            last = self.db.execute("SELECT max(segment) FROM responses").fetchone()[0]
+            self.segment = last or 0
+            self.file = open(self._segment_name(self.segment), "ab")
+        if self.file.tell() >= self.segment_size:
+            self.file.close()
+            self.segment += 1
+            self.file = open(self._segment_name(self.segment), "ab")
+        return self.file
+
+    def put(self, url, status, headers, body, reason=""):
+        header = {"status": status, "reason": reason, "headers": headers, "time": time.time()}
+        record = self._compress(json.dumps(header).encode() + b"\n" + body)
+        with self.lock:
+            f = self._open_segment()
+            offset = f.seek(0, os.SEEK_END)
+            f.write(record)
+            f.flush()
+            # The record is on disk before the index points to it
+            with self.db:
+                self.db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                                (url, self.segment, offset, len(record)))
+
+    def get(self, url):
+        # Returns (status, reason, headers, body), or None if url was not recorded
+        with self.lock:
+            row = self.db.execute("SELECT segment, offset, length FROM responses WHERE url = ?",
+                                  (url,)).fetchone()
+            if row is None:
+                return None
+            segment, offset, length = row
+            data = self._map(segment, offset + length)[offset:offset + length]
+        header, _, body = self._decompress(data).partition(b"\n")
+        header = json.loads(header)
+        return header["status"], header["reason"], header["headers"], body
+
+    def _map(self, segment, end):
+        # Mapped again when the segment has grown since it was last mapped
+        m = self.maps.get(segment)
+        if m is None or len(m) < end:
+            if m is not None:
+                m.close()
+            with open(self._segment_name(segment), "rb") as f:
+                m = self.maps[segment] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return m
+
+    def __contains__(self, url):
+        return self.db.execute("SELECT 1 FROM responses WHERE url = ?", (url,)).fetchone() is not None
+
+    def __len__(self):
+        return self.db.execute("SELECT count(*) FROM responses").fetchone()[0]
+
+    def close(self):
+        for m in self.maps.values():
+            m.close()
+        self.maps.clear()
+        if self.file is not None:
+            self.file.close()
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def record_hook(archive):
+    # Response hook that saves every response, including redirects
+    def hook(response, *args, **kwargs):
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in SKIPPED_HEADERS}
+        archive.put(response.request.url, response.status_code, headers,
+                    response.content, response.reason or "")
+        return response
+
+    return hook
+
+
+class ReplayAdapter(BaseAdapter):
+    # Answers every request from the archive and never opens a connection
+    def __init__(self, archive):
+        super().__init__()
+        self.archive = archive
+
+    def send(self, request, **kwargs):
+        record = self.archive.get(request.url)
+        if record is None:
+            raise requests.ConnectionError(f"{request.url} is not in the archive", request=request)
+        status, reason, headers, body = record
+
+        response = requests.Response()
+        response.status_code = status
+        response.reason = reason
+        response.headers = CaseInsensitiveDict(headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = body
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
+
+
+class ArchiveSession(requests.Session):
+    def __init__(self, mode, path=ARCHIVE_DIR):
+        super().__init__()
+        if mode == "record":
+            self.archive = ResponseArchive(path, "a")
+            self.hooks["response"].append(record_hook(self.archive))
+        elif mode == "replay":
+            self.archive = ResponseArchive(path, "r")
+            # Nothing goes over the network, so skip the proxy settings lookup
+            self.trust_env = False
+            adapter = ReplayAdapter(self.archive)
+            self.mount("http://", adapter)
+            self.mount("https://", adapter)
+        else:
+            raise ValueError(f"Unknown archive mode: {mode}")
+
+    def close(self):
+        super().close()
+        self.archive.close()
+
+
+def open_session(mode=None, path=ARCHIVE_DIR) -> requests.Session:
+    # mode: None for a normal session, "record" or "replay"
+    if mode is None:
+        return requests.Session()
+    return ArchiveSession(mode, path)
@@ -1,20 +1,25 @@
 import smtplib
 import pandas as pd
-import requests
 from bs4 import BeautifulSoup
 from price_parser import Price
 
+from response_archive import open_session
+
 PRODUCT_URL_CSV = "products.csv"
 SAVE_TO_CSV = True
 PRICES_CSV = "prices.csv"
 SEND_MAIL = True
+# "record" saves the product pages to ARCHIVE_DIR and "replay" reads them back,
+# to test get_price offline. Scheduled runs must keep None.
+ARCHIVE_MODE = None
+ARCHIVE_DIR = "responses"
 
 def get_urls(csv_file):
     df = pd.read_csv(csv_file)
     return df
 
-def get_response(url):
-    response = requests.get(url)
+def get_response(session, url):
+    response = session.get(url)
     return response.text
 
 def get_price(html):
@@ -23,10 +28,10 @@ def get_price(html):
     price = Price.fromstring(el.text)
     return price.amount_float
 
-def process_products(df):
+def process_products(session, df):
     updated_products = []
-     for product in df.to_dict("records"):
-        html = get_response(product["url"])
+    for product in df.to_dict("records"):
+        html = get_response(session, product["url"])
         product["price"] = get_price(html)
         product["alert"] = product["price"] < product["alert_price"]
         updated_products.append(product)
@@ -47,7 +52,13 @@ def send_mail(df):
 
 def main():
     df = get_urls(PRODUCT_URL_CSV)
-    df_updated = process_products(df)
+    with open_session(ARCHIVE_MODE, ARCHIVE_DIR) as session:
+        df_updated = process_products(session, df)
+    if ARCHIVE_MODE == "replay":
+        # The saved prices are old, they must not be stored or mailed as new ones
+        print(df_updated)
+        print("Replay mode: prices are not saved and no mail is sent")
+        return
     if SAVE_TO_CSV:
         df_updated.to_csv(PRICES_CSV, index=False, mode="a")
     if SEND_MAIL:
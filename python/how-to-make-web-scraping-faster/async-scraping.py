@@ -1,8 +1,19 @@
-import aiohttp 
 import asyncio
 import csv
 import re
 import time
+from urllib.parse import urlsplit
+
+from retry import Retrier, check_status
+from timing import Metrics
+from transport import CONNECTION_ERRORS, open_client
+
+# True to fetch over HTTP/2 with httpx, see transport.py
+HTTP2 = False
+
+metrics = Metrics()
+
+retrier = Retrier(retry_on=CONNECTION_ERRORS)
 
 def get_links():
     links = []
@@ -13,26 +24,37 @@ def get_links():
 
     return links
 
-async def get_response(session, url):
-    async with session.get(url) as resp:
-        text = await resp.text()
-        
-        exp = r'(<title>).*(<\/title>)'
-        return re.search(exp, text,flags=re.DOTALL).group(0)
+async def fetch_title(url, client):
+    page = await client.fetch(url)
+    check_status(page.status, page.headers)
+    page.raise_for_status()
+
+    exp = r'(<title>).*(<\/title>)'
+    with metrics.timer('parse', urlsplit(page.url).hostname):
+        return re.search(exp, page.text,flags=re.DOTALL).group(0)
+
+async def get_response(client, url):
+    return await retrier.call_async(url, fetch_title, client)
 
 async def main():
     start_time = time.time()
-    async with aiohttp.ClientSession() as session:
+    async with open_client(HTTP2, metrics=metrics) as client:
 
         tasks = []
         for url in get_links():
-            tasks.append(asyncio.create_task(get_response(session, url)))
+            tasks.append(asyncio.create_task(get_response(client, url)))
 
-        results = await asyncio.gather(*tasks)
+        # A failed page does not cancel the others, it is counted in the report
+        results = await asyncio.gather(*tasks, return_exceptions=True)
         for result in results:
-            print(result)
+            if not isinstance(result, Exception):
+                print(result)
 
+    print(retrier.summary())
     print(f"{(time.time() - start_time):.2f} seconds")
+    print(metrics.report())
+    metrics.write_json("timings.json")
+    metrics.write_prometheus("timings.prom")
 
 
 asyncio.run(main())
\ No newline at end of file
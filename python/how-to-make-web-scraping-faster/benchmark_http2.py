@@ -0,0 +1,223 @@
+# Compares HTTP/1.1 with aiohttp and HTTP/2 with httpx (see transport.py)
+# against one local host over TLS, the way a crawl of a single catalogue
+# hits one website. The test server is hypercorn, which speaks both
+# protocols and picks one with ALPN, and it counts the TCP connections
+# each run opened. Needs: pip install hypercorn "httpx[http2,brotli,zstd]"
+# and the openssl command for a throwaway certificate.
+# Usage: python benchmark_http2.py [number_of_requests]
+import asyncio
+import gzip
+import json
+import os
+import random
+import resource
+import ssl
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from multiprocessing import Process
+
+import brotli
+import zstandard
+from hypercorn.asyncio import serve as hypercorn_serve
+from hypercorn.config import Config
+
+from fixture_server import sample_latency, PAGE_SIZE, LATENCY
+from transport import AiohttpClient, HttpxClient, CONNECTION_ERRORS
+
+PORT = 8901
+CONCURRENCY_LEVELS = (10, 100, 500)
+H2_MAX_CONCURRENT_STREAMS = 128  # the nginx default
+WORDS = ('book price stock rating title author review travel mystery history poetry '
+         'fiction music science romance classic fantasy humor').split()
+ENCODINGS = ('zstd', 'br', 'gzip')  # in the order the server prefers them
+
+# Every client gets its own SSL context, because httpx sets the ALPN
+# protocols on the one it is given
+CLIENTS = {
+    'aiohttp h1': lambda limit, cafile: AiohttpClient(limit, ssl=ssl.create_default_context(cafile=cafile)),
+    'httpx h1': lambda limit, cafile: HttpxClient(limit, ssl=ssl.create_default_context(cafile=cafile), http2=False),
+    'httpx h2': lambda limit, cafile: HttpxClient(limit, ssl=ssl.create_default_context(cafile=cafile), http2=True),
+}
+
+
+def make_page(page_size, rng) -> bytes:
+    # Random words instead of a repeated sentence, so it compresses about as
+    # well as a real catalogue page
+    items = []
+    while sum(map(len, items)) < page_size:
+        items.append(f'<li class="product"><a href="/catalogue/{rng.randrange(10**6)}">'
+                     f'{" ".join(rng.choices(WORDS, k=6))}</a> <p>£{rng.uniform(10, 60):.2f}</p></li>')
+    return f'<html><head><title>Catalogue</title></head><body><ul>{"".join(items)}</ul></body></html>'.encode()
+
+
+def create_asgi_app(page_size=PAGE_SIZE, latency=LATENCY, seed=42):
+    # Every page is the same, compressed once per encoding at startup, so the
+    # server spends its CPU on the protocol and not on compression
+    rng = random.Random(seed)
+    page = make_page(page_size, rng)
+    bodies = {
+        'zstd': zstandard.ZstdCompressor(level=3).compress(page),
+        'br': brotli.compress(page, quality=5),
+        'gzip': gzip.compress(page, compresslevel=6),
+        'identity': page,
+    }
+    stats = {'connections': set(), 'versions': Counter(), 'encodings': Counter(), 'bytes': 0}
+
+    async def send_json(send, data):
+        body = json.dumps(data).encode()
+        await send({'type': 'http.response.start', 'status': 200,
+                    'headers': [(b'content-type', b'application/json')]})
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def app(scope, receive, send):
+        if scope['type'] == 'lifespan':
+            while True:
+                message = await receive()
+                await send({'type': message['type'] + '.complete'})
+                if message['type'] == 'lifespan.shutdown':
+                    return
+
+        if scope['path'] == '/stats':
+            # Returns the counters of the run that just finished, and resets them
+            await send_json(send, {
+                'connections': len(stats['connections']),
+                'versions': stats['versions'],
+                'encodings': stats['encodings'],
+                'bytes': stats['bytes'],
+            })
+            stats['connections'].clear()
+            for key in ('versions', 'encodings'):
+                stats[key].clear()
+            stats['bytes'] = 0
+            return
+
+        headers = dict(scope['headers'])
+        accepted = {e.split(';')[0].strip() for e in headers.get(b'accept-encoding', b'').decode().split(',')}
+        encoding = next((e for e in ENCODINGS if e in accepted), 'identity')
+        body = bodies[encoding]
+        stats['connections'].add(tuple(scope['client']))
+        stats['versions'][scope['http_version']] += 1
+        stats['encodings'][encoding] += 1
+        stats['bytes'] += len(body)
+
+        await asyncio.sleep(sample_latency(latency, rng))
+        response_headers = [(b'content-type', b'text/html; charset=utf-8'), (b'vary', b'accept-encoding')]
+        if encoding != 'identity':
+            response_headers.append((b'content-encoding', encoding.encode()))
+        await send({'type': 'http.response.start', 'status': 200, 'headers': response_headers})
+        await send({'type': 'http.response.body', 'body': body})
+
+    return app
+
+
+def serve(certfile, keyfile):
+    config = Config()
+    config.bind = [f'127.0.0.1:{PORT}']
+    config.certfile = certfile
+    config.keyfile = keyfile
+    config.h2_max_concurrent_streams = H2_MAX_CONCURRENT_STREAMS
+    config.keep_alive_max_requests = 10**6  # hypercorn closes a connection after 1000 by default
+    config.backlog = 1024
+    config.accesslog = None
+    config.errorlog = None
+    asyncio.run(hypercorn_serve(create_asgi_app(), config))
+
+
+def make_certificate(directory):
+    certfile = os.path.join(directory, 'cert.pem')
+    keyfile = os.path.join(directory, 'key.pem')
+    subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+                    '-subj', '/CN=localhost', '-addext', 'subjectAltName=IP:127.0.0.1',
+                    '-keyout', keyfile, '-out', certfile],
+                   check=True, capture_output=True)
+    return certfile, keyfile
+
+
+async def get_response(client, semaphore, url):
+    # Returns (latency, ok). Waiting for a free slot is not counted.
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            page = await client.fetch(url)
+            ok = page.status == 200 and '<title>' in page.text
+        except CONNECTION_ERRORS:
+            ok = False
+        return time.perf_counter() - start, ok
+
+
+async def run_client(name, concurrency, urls, cafile):
+    semaphore = asyncio.Semaphore(concurrency)
+    async with CLIENTS[name](concurrency, cafile) as client:
+        return await asyncio.gather(*[get_response(client, semaphore, url) for url in urls])
+
+
+async def get_stats(cafile):
+    async with CLIENTS['aiohttp h1'](1, cafile) as client:
+        return json.loads((await client.fetch(f'https://127.0.0.1:{PORT}/stats')).text)
+
+
+def run(name, concurrency, urls, cafile) -> dict:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    start = time.perf_counter()
+    results = asyncio.run(run_client(name, concurrency, urls, cafile))
+    wall = time.perf_counter() - start
+    after = resource.getrusage(resource.RUSAGE_SELF)
+    stats = asyncio.run(get_stats(cafile))
+
+    latencies = sorted(latency for latency, _ in results)
+
+    def percentile(q):
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+    return {
+        'client': name,
+        'concurrency': concurrency,
+        'requests_per_second': len(urls) / wall,
+        'p50': percentile(0.50),
+        'p99': percentile(0.99),
+        'errors': sum(not ok for _, ok in results),
+        'connections': stats['connections'],
+        'protocol': ','.join(f'HTTP/{version}' for version in stats['versions']),
+        'encoding': ','.join(stats['encodings']),
+        'kib_per_page': stats['bytes'] / len(urls) / 1024,
+        'cpu_seconds': after.ru_utime + after.ru_stime - usage.ru_utime - usage.ru_stime,
+    }
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    urls = [f'https://127.0.0.1:{PORT}/catalogue/{i}' for i in range(total)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        certfile, keyfile = make_certificate(tmp)
+        server = Process(target=serve, args=(certfile, keyfile), daemon=True)
+        server.start()
+        for _ in range(100):
+            try:
+                asyncio.run(get_stats(certfile))
+                break
+            except CONNECTION_ERRORS:
+                time.sleep(0.1)
+        else:
+            raise RuntimeError('Test server did not start')
+
+        print(f"{total} requests to one host, {PAGE_SIZE} byte pages, latency {LATENCY}, "
+              f"{H2_MAX_CONCURRENT_STREAMS} streams per HTTP/2 connection")
+        print(f"{'client':<11}{'workers':>8}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}"
+              f"{'conns':>7}{'KiB/page':>10}{'CPU s':>8}  protocol, encoding")
+        for concurrency in CONCURRENCY_LEVELS:
+            for name in CLIENTS:
+                r = run(name, concurrency, urls, certfile)
+                print(f"{r['client']:<11}{r['concurrency']:>8}{r['requests_per_second']:>9.1f}"
+                      f"{r['p50'] * 1000:>9.0f}{r['p99'] * 1000:>9.0f}{r['errors']:>8}"
+                      f"{r['connections']:>7}{r['kib_per_page']:>10.1f}{r['cpu_seconds']:>8.2f}"
+                      f"  {r['protocol']}, {r['encoding']}")
+
+        server.terminate()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+# Runs the sync, thread, process and async strategies of this tutorial
+# against fixture_server.py with the same URLs, and prints throughput,
+# latency percentiles, CPU time and peak memory for several concurrency levels.
+# Usage: python benchmark_strategies.py [number_of_requests]
+import asyncio
+import re
+import resource
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Pipe, Pool, Process
+
+import aiohttp
+import requests
+from aiohttp import web
+
+from fixture_server import create_app, PAGE_SIZE, LATENCY, ERROR_RATE, HOST_LIMIT
+
+PORT = 8900
+HOSTS = 4
+CONCURRENCY_LEVELS = (10, 50, 100)
+TIMEOUT_IN_SECONDS = 30
+
+# Printed above the results, so a table can always be traced back to its inputs
+SERVER = {
+    'page_size': PAGE_SIZE,
+    'latency': LATENCY,
+    'error_rate': ERROR_RATE,
+    'host_limit': HOST_LIMIT,
+}
+
+TITLE_RE = re.compile(r'(<title>).*(<\/title>)', flags=re.DOTALL)
+
+
+def get_response(session, url):
+    # Returns (latency, ok), an error is counted instead of stopping the run
+    start = time.perf_counter()
+    try:
+        resp = session.get(url, timeout=TIMEOUT_IN_SECONDS)
+        ok = resp.status_code == 200 and TITLE_RE.search(resp.text) is not None
+    except requests.RequestException:
+        ok = False
+    return time.perf_counter() - start, ok
+
+
+def get_response_new_connection(url):
+    # The thread and process scripts call requests.get() without a session
+    return get_response(requests, url)
+
+
+def run_sync(urls, concurrency):
+    with requests.Session() as session:
+        return [get_response(session, url) for url in urls]
+
+
+def run_threads(urls, concurrency):
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(get_response_new_connection, urls))
+
+
+def run_processes(urls, concurrency):
+    with Pool(concurrency) as pool:
+        return pool.map(get_response_new_connection, urls)
+
+
+async def get_response_async(session, semaphore, url):
+    # Waiting for a free slot is not counted, the same as waiting for a free
+    # thread or process in the other strategies
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            async with session.get(url) as resp:
+                text = await resp.text()
+                ok = resp.status == 200 and TITLE_RE.search(text) is not None
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            ok = False
+        return time.perf_counter() - start, ok
+
+
+async def run_async_main(urls, concurrency):
+    timeout = aiohttp.ClientTimeout(total=TIMEOUT_IN_SECONDS)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        return await asyncio.gather(*[get_response_async(session, semaphore, url)
+                                      for url in urls])
+
+
+def run_async(urls, concurrency):
+    return asyncio.run(run_async_main(urls, concurrency))
+
+
+STRATEGIES = {
+    'sync': run_sync,
+    'thread': run_threads,
+    'process': run_processes,
+    'async': run_async,
+}
+
+
+def measure(strategy, concurrency, urls, conn):
+    # Runs in a fresh process, so CPU time and memory belong to one run only
+    start = time.perf_counter()
+    results = STRATEGIES[strategy](urls, concurrency)
+    wall = time.perf_counter() - start
+
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+    # ru_maxrss is in KiB on Linux. For the children only the largest one is
+    # known, so the pool's total is estimated as largest * pool size.
+    rss = own.ru_maxrss
+    if strategy == 'process':
+        rss += children.ru_maxrss * concurrency
+    conn.send((wall, cpu, rss * 1024, results))
+    conn.close()
+
+
+def run(strategy, concurrency, urls) -> dict:
+    parent_conn, child_conn = Pipe(duplex=False)
+    process = Process(target=measure, args=(strategy, concurrency, urls, child_conn))
+    process.start()
+    wall, cpu, rss, results = parent_conn.recv()
+    process.join()
+
+    latencies = sorted(latency for latency, _ in results)
+    errors = sum(not ok for _, ok in results)
+
+    def percentile(q):
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+    return {
+        'strategy': strategy,
+        'concurrency': concurrency,
+        'requests_per_second': len(urls) / wall,
+        'p50': percentile(0.50),
+        'p90': percentile(0.90),
+        'p99': percentile(0.99),
+        'errors': errors,
+        'cpu_seconds': cpu,
+        'rss_mib': rss / 1024 / 1024,
+    }
+
+
+def serve():
+    web.run_app(create_app(**SERVER), host='127.0.0.1', port=PORT, print=None)
+
+
+def start_server():
+    process = Process(target=serve, daemon=True)
+    process.start()
+    for _ in range(100):
+        try:
+            requests.get(f'http://127.0.0.1:{PORT}/host-0/0', timeout=1)
+            return process
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    raise RuntimeError('Fixture server did not start')
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    urls = [f'http://127.0.0.1:{PORT}/host-{i % HOSTS}/{i}' for i in range(total)]
+    server = start_server()
+
+    print(f"{total} requests, {HOSTS} hosts, server settings: {SERVER}")
+    print(f"{'strategy':<9}{'workers':>8}{'req/s':>9}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}"
+          f"{'errors':>8}{'CPU s':>8}{'RSS MiB':>9}")
+    runs = [('sync', 1)] + [(strategy, concurrency)
+                            for strategy in ('thread', 'process', 'async')
+                            for concurrency in CONCURRENCY_LEVELS]
+    for strategy, concurrency in runs:
+        r = run(strategy, concurrency, urls)
+        print(f"{r['strategy']:<9}{r['concurrency']:>8}{r['requests_per_second']:>9.1f}"
+              f"{r['p50'] * 1000:>9.0f}{r['p90'] * 1000:>9.0f}{r['p99'] * 1000:>9.0f}"
+              f"{r['errors']:>8}{r['cpu_seconds']:>8.2f}{r['rss_mib']:>9.0f}")
+
+    server.terminate()
+
+
+if __name__ == '__main__':
+    main()
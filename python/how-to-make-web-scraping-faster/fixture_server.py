@@ -0,0 +1,61 @@
+# Local test site for benchmark_strategies.py, so that every strategy is
+# measured against the same, reproducible server instead of a live website:
+#   python fixture_server.py
+#   http://localhost:8900/host-0/1
+# The first path segment stands for a host. Every host serves at most
+# HOST_LIMIT requests at a time, the others wait as they would on a busy site.
+import asyncio
+import random
+from collections import defaultdict
+
+from aiohttp import web
+
+PORT = 8900
+PAGE_SIZE = 50_000  # bytes
+LATENCY = ('lognormal', 0.05, 0.5)  # median of 50 ms, see sample_latency()
+ERROR_RATE = 0.01  # share of requests answered with 503
+HOST_LIMIT = 20
+
+
+def sample_latency(latency, rng) -> float:
+    # ('constant', seconds), ('uniform', low, high) or ('lognormal', median, sigma)
+    kind, *args = latency
+    if kind == 'constant':
+        return args[0]
+    if kind == 'uniform':
+        return rng.uniform(*args)
+    if kind == 'lognormal':
+        median, sigma = args
+        return median * rng.lognormvariate(0, sigma)
+    raise ValueError(f'Unknown latency distribution: {kind}')
+
+
+def make_page(n, page_size) -> str:
+    head = f'<html><head><title>Page {n}</title></head><body>'
+    tail = '</body></html>'
+    filler = '<p>Lorem ipsum dolor sit amet.</p>' * (page_size // 34 + 1)
+    return head + filler[:max(0, page_size - len(head) - len(tail))] + tail
+
+
+def create_app(page_size=PAGE_SIZE, latency=LATENCY, error_rate=ERROR_RATE,
+               host_limit=HOST_LIMIT, seed=42):
+    rng = random.Random(seed)
+    limits = defaultdict(lambda: asyncio.Semaphore(host_limit))
+    body = make_page('{n}', page_size)
+
+    async def page(request):
+        host = request.match_info['host']
+        async with limits[host]:
+            await asyncio.sleep(sample_latency(latency, rng))
+        if rng.random() < error_rate:
+            return web.Response(status=503, text='Service Unavailable')
+        return web.Response(text=body.replace('{n}', request.match_info['n'], 1),
+                            content_type='text/html')
+
+    app = web.Application()
+    app.router.add_get('/{host}/{n}', page)
+    return app
+
+
+if __name__ == '__main__':
+    web.run_app(create_app(), port=PORT)
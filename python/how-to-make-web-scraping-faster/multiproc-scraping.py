@@ -2,7 +2,7 @@ import csv
 import re
 import time
 import requests
-from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Pool
 
 def get_links():
     links = []
@@ -31,4 +31,7 @@ def main():
         for result in results:
             print(result)
 
-    print(f"{(time.time() - start_time):.2f} seconds")
\ No newline at end of file
+    print(f"{(time.time() - start_time):.2f} seconds")
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -3,6 +3,11 @@ import re
 import time
 import requests
 from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from timing import Metrics, requests_hook
+
+metrics = Metrics()
 
 def get_links():
     links = []
@@ -14,12 +19,13 @@ def get_links():
     return links
 
 def get_response(url):
-    resp = requests.get(url)
+    resp = requests.get(url, hooks={'response': requests_hook(metrics)})
     print('.', end='', flush=True)
     text = resp.text
     
     exp = r'(<title>).*(<\/title>)'
-    return re.search(exp, text, flags=re.DOTALL).group(0)
+    with metrics.timer('parse', urlsplit(url).hostname):
+        return re.search(exp, text, flags=re.DOTALL).group(0)
 
 def main():
     start_time = time.time()
@@ -31,4 +37,9 @@ def main():
         for result in results:
             print(result)
 
-    print(f"{(time.time() - start_time):.2f} seconds")
\ No newline at end of file
+    print(f"{(time.time() - start_time):.2f} seconds")
+    print(metrics.report())
+    metrics.write_json("timings.json")
+    metrics.write_prometheus("timings.prom")
+
+main()
\ No newline at end of file
@@ -0,0 +1,73 @@
+import asyncio
+import csv
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import aiohttp
+import requests
+
+from politeness import PolitenessScheduler
+
+def get_links():
+    links = []
+    with open("links.csv", "r") as f:
+        reader = csv.reader(f)
+        for i, row in enumerate(reader):
+            links.append(row[0])
+
+    return links
+
+def get_title(text):
+    exp = r'(<title>).*(<\/title>)'
+    return re.search(exp, text, flags=re.DOTALL).group(0)
+
+def thread_worker(scheduler, session, results):
+    # A failed URL is reported and skipped, the worker goes on with the next one
+    while (url := scheduler.get()) is not None:
+        try:
+            results.append(get_title(session.get(url).text))
+        except (requests.RequestException, AttributeError) as e:
+            print(f"Failed to scrape {url}: {e!r}")
+
+def main_threads(scheduler):
+    results = []
+    with requests.Session() as session:
+        with ThreadPoolExecutor(max_workers=20) as p:
+            workers = [p.submit(thread_worker, scheduler, session, results) for _ in range(20)]
+            for worker in workers:
+                worker.result()  # raises anything a worker did not expect
+    return results
+
+async def async_worker(scheduler, session, results):
+    while (url := await scheduler.get_async()) is not None:
+        try:
+            async with session.get(url) as resp:
+                results.append(get_title(await resp.text()))
+        except (aiohttp.ClientError, asyncio.TimeoutError, AttributeError) as e:
+            print(f"Failed to scrape {url}: {e!r}")
+
+async def main_async(scheduler):
+    results = []
+    async with aiohttp.ClientSession() as session:
+        await asyncio.gather(*[async_worker(scheduler, session, results) for _ in range(20)])
+    return results
+
+def main(use_asyncio=True):
+    start_time = time.time()
+    # Each host gets at most one request per second (or its robots.txt
+    # crawl-delay), different hosts are fetched in parallel
+    scheduler = PolitenessScheduler(default_delay=1.0)
+    for url in get_links():
+        scheduler.add(url)
+
+    if use_asyncio:
+        results = asyncio.run(main_async(scheduler))
+    else:
+        results = main_threads(scheduler)
+    for result in results:
+        print(result)
+
+    print(f"{(time.time() - start_time):.2f} seconds")
+
+main()
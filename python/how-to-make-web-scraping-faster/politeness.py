@@ -0,0 +1,149 @@
+# Per-host politeness for both threads and asyncio.
+#
+# URLs wait in one priority queue per host. Every host has its own token
+# bucket with a rate taken from the crawl-delay in robots.txt (or a default),
+# and robots.txt is fetched once per host and cached for ROBOTS_TTL seconds.
+# get() always hands out the URL of the host that is ready first, so slow
+# hosts are throttled while the other hosts keep the crawl busy.
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+USER_AGENT = 'Mozilla/5.0'
+DEFAULT_DELAY_IN_SECONDS = 1.0
+ROBOTS_TTL_IN_SECONDS = 3600
+ROBOTS_TIMEOUT_IN_SECONDS = 10
+
+
+def fetch_robots(base_url, user_agent=USER_AGENT):
+    parser = RobotFileParser(base_url + '/robots.txt')
+    try:
+        response = requests.get(parser.url, headers={'User-Agent': user_agent},
+                                timeout=ROBOTS_TIMEOUT_IN_SECONDS)
+    except requests.RequestException:
+        parser.allow_all = True
+        return parser
+    if response.status_code in (401, 403):
+        parser.disallow_all = True
+    elif response.status_code >= 400:
+        parser.allow_all = True
+    else:
+        parser.parse(response.text.splitlines())
+    return parser
+
+
+class Host:
+    def __init__(self, robots, delay, burst):
+        self.robots = robots
+        self.robots_fetched_at = time.monotonic()
+        self.rate = 1 / delay if delay > 0 else float('inf')
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.queue = []
+
+    def ready_at(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            return now
+        return now + (1 - self.tokens) / self.rate
+
+
+class PolitenessScheduler:
+    def __init__(self, user_agent=USER_AGENT, default_delay=DEFAULT_DELAY_IN_SECONDS,
+                 burst=1, robots_ttl=ROBOTS_TTL_IN_SECONDS, robots_fetcher=fetch_robots):
+        self.user_agent = user_agent
+        self.default_delay = default_delay
+        self.burst = burst
+        self.robots_ttl = robots_ttl
+        self.robots_fetcher = robots_fetcher
+        self.hosts = {}
+        self.ready = []  # (time the host may be called again, host)
+        self.counter = itertools.count()
+        self.lock = threading.Lock()
+
+    def _host(self, base_url):
+        host = self.hosts.get(base_url)
+        if host is not None and time.monotonic() - host.robots_fetched_at < self.robots_ttl:
+            return host
+
+        # Fetched outside the lock, other hosts are not blocked meanwhile
+        robots = self.robots_fetcher(base_url, self.user_agent)
+        delay = robots.crawl_delay(self.user_agent)
+        rate = robots.request_rate(self.user_agent)
+        if delay is None and rate is not None:
+            delay = rate.seconds / rate.requests
+        delay = self.default_delay if delay is None else float(delay)
+
+        with self.lock:
+            if host is None:
+                host = self.hosts.setdefault(base_url, Host(robots, delay, self.burst))
+            else:
+                host.robots = robots
+                host.robots_fetched_at = time.monotonic()
+                host.rate = 1 / delay if delay > 0 else float('inf')
+        return host
+
+    def add(self, url, priority=0):
+        # Higher priority first. Returns False if robots.txt disallows the URL.
+        parts = urlsplit(url)
+        base_url = f'{parts.scheme}://{parts.netloc}'
+        host = self._host(base_url)
+        if not host.robots.can_fetch(self.user_agent, url):
+            return False
+
+        with self.lock:
+            if not host.queue:
+                heapq.heappush(self.ready, (host.ready_at(time.monotonic()), next(self.counter), base_url))
+            heapq.heappush(host.queue, (-priority, next(self.counter), url))
+        return True
+
+    async def add_async(self, url, priority=0):
+        # robots.txt is fetched in a thread so the event loop keeps running
+        return await asyncio.to_thread(self.add, url, priority)
+
+    def poll(self):
+        # Returns (url, 0) if a URL can be fetched now, (None, seconds to wait)
+        # if every host is still throttled, or (None, None) when nothing is left.
+        with self.lock:
+            if not self.ready:
+                return None, None
+            now = time.monotonic()
+            ready_at, _, base_url = self.ready[0]
+            if ready_at > now:
+                return None, ready_at - now
+
+            heapq.heappop(self.ready)
+            host = self.hosts[base_url]
+            if host.ready_at(now) > now:
+                # The rate changed since the host was queued
+                heapq.heappush(self.ready, (host.ready_at(now), next(self.counter), base_url))
+                return None, 0
+            host.tokens -= 1
+            _, _, url = heapq.heappop(host.queue)
+            if host.queue:
+                heapq.heappush(self.ready, (host.ready_at(now), next(self.counter), base_url))
+            return url, 0
+
+    def get(self):
+        # For threads: blocks until a URL may be fetched, None when done
+        while True:
+            url, wait = self.poll()
+            if wait is None or url is not None:
+                return url
+            time.sleep(wait)
+
+    async def get_async(self):
+        # For asyncio: waits without blocking the event loop, None when done
+        while True:
+            url, wait = self.poll()
+            if wait is None or url is not None:
+                return url
+            await asyncio.sleep(wait)
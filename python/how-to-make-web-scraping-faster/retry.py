@@ -0,0 +1,199 @@
+# Retries with exponential backoff and a circuit breaker per host.
+#
+# A failed request is retried after a random delay of up to
+# BASE_DELAY * 2 ** attempt seconds (full jitter), or after the Retry-After
+# header when the server sends one. After FAILURE_THRESHOLD failures in a row
+# a host's circuit opens: requests to it fail at once with CircuitOpen for
+# RESET_TIMEOUT seconds, then a single probe request decides whether it closes
+# again. Other hosts are never affected. Every failure is counted in
+# Retrier.report, which can be printed at the end of a run.
+import asyncio
+import random
+import threading
+import time
+from collections import Counter
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+ATTEMPTS = 4
+BASE_DELAY_IN_SECONDS = 0.5
+MAX_DELAY_IN_SECONDS = 30
+FAILURE_THRESHOLD = 5
+RESET_TIMEOUT_IN_SECONDS = 30
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class RetryableStatus(Exception):
+    def __init__(self, status, retry_after=None):
+        super().__init__(f'HTTP {status}')
+        self.status = status
+        self.retry_after = retry_after
+
+
+class CircuitOpen(Exception):
+    pass
+
+
+def host_of(url) -> str:
+    # Credentials in proxy URLs must not end up in the report
+    return urlsplit(url).netloc.rpartition('@')[2]
+
+
+def parse_retry_after(value):
+    # Retry-After is either a number of seconds or an HTTP date
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def check_status(status, headers, statuses=RETRY_STATUSES):
+    # Works with both requests (response.status_code) and aiohttp (resp.status)
+    if status in statuses:
+        raise RetryableStatus(status, parse_retry_after(headers.get('Retry-After')))
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT_IN_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.open_until = 0.0
+        self.probing = False
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self.lock:
+            if self.failures < self.failure_threshold:
+                return True
+            # Open: wait for the timeout, then let exactly one request through
+            if self.probing or time.monotonic() < self.open_until:
+                return False
+            self.probing = True
+            return True
+
+    def success(self):
+        with self.lock:
+            self.failures = 0
+            self.probing = False
+
+    def release(self):
+        # The request ended without telling anything about the host
+        with self.lock:
+            self.probing = False
+
+    def failure(self, open_for=None):
+        with self.lock:
+            self.failures += 1
+            self.probing = False
+            if open_for is not None:
+                self.failures = max(self.failures, self.failure_threshold)
+            if self.failures >= self.failure_threshold:
+                self.open_until = time.monotonic() + max(open_for or 0, self.reset_timeout)
+
+
+class Retrier:
+    def __init__(self, retry_on=(OSError, asyncio.TimeoutError), attempts=ATTEMPTS,
+                 base_delay=BASE_DELAY_IN_SECONDS, max_delay=MAX_DELAY_IN_SECONDS,
+                 failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT_IN_SECONDS):
+        self.retry_on = tuple(retry_on) + (RetryableStatus,)
+        # Everything call() raises after giving up on a URL
+        self.errors = self.retry_on + (CircuitOpen,)
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.breakers = {}
+        self.report = Counter()  # (host, reason) -> number of failures
+        self.lock = threading.Lock()
+
+    def breaker(self, url) -> CircuitBreaker:
+        host = host_of(url)
+        with self.lock:
+            if host not in self.breakers:
+                self.breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return self.breakers[host]
+
+    def _record(self, url, reason):
+        with self.lock:
+            self.report[host_of(url), reason] += 1
+
+    def _before(self, url, breaker):
+        if not breaker.allow():
+            self._record(url, 'circuit open')
+            raise CircuitOpen(host_of(url))
+
+    def _after_failure(self, url, breaker, error, attempt):
+        # Returns how long to wait before the next attempt, or raises
+        reason = str(error) if isinstance(error, RetryableStatus) else type(error).__name__
+        self._record(url, reason)
+        retry_after = getattr(error, 'retry_after', None)
+        if retry_after is not None and retry_after > self.max_delay:
+            # The host asked for a long break, give it one without waiting here
+            breaker.failure(open_for=retry_after)
+            raise error
+        breaker.failure()
+        if attempt + 1 >= self.attempts:
+            raise error
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def call(self, url, func, *args, **kwargs):
+        # Calls func(url, *args, **kwargs) until it succeeds. func should call
+        # check_status() on the response so that 429s and 5xx are retried.
+        breaker = self.breaker(url)
+        for attempt in range(self.attempts):
+            self._before(url, breaker)
+            try:
+                result = func(url, *args, **kwargs)
+            except self.retry_on as error:
+                delay = self._after_failure(url, breaker, error, attempt)
+            except Exception as error:
+                # Not retried, e.g. a 404 or a parsing error, but still reported
+                self._record(url, type(error).__name__)
+                breaker.release()
+                raise
+            except BaseException:
+                breaker.release()
+                raise
+            else:
+                breaker.success()
+                return result
+            time.sleep(delay)
+
+    async def call_async(self, url, func, *args, **kwargs):
+        # Same as call(), for a coroutine function
+        breaker = self.breaker(url)
+        for attempt in range(self.attempts):
+            self._before(url, breaker)
+            try:
+                result = await func(url, *args, **kwargs)
+            except self.retry_on as error:
+                delay = self._after_failure(url, breaker, error, attempt)
+            except Exception as error:
+                # Not retried, e.g. a 404 or a parsing error, but still reported
+                self._record(url, type(error).__name__)
+                breaker.release()
+                raise
+            except BaseException:
+                breaker.release()
+                raise
+            else:
+                breaker.success()
+                return result
+            await asyncio.sleep(delay)
+
+    def summary(self) -> str:
+        if not self.report:
+            return 'No failures'
+        lines = [f'{count:>6}  {host}  {reason}'
+                 for (host, reason), count in self.report.most_common()]
+        return '\n'.join(['Failures by host:'] + lines)
@@ -1,7 +1,11 @@
 import csv
 import re
 import time
-import requests
+from urllib.parse import urlsplit
+
+from timing import Metrics, timed_session
+
+metrics = Metrics()
 
 def get_links():
     links = []
@@ -17,16 +21,20 @@ def get_response(session, url):
         print('.', end='', flush=True)
         text = resp.text
         exp = r'(<title>).*(<\/title>)'
-        return re.search(exp, text,flags=re.DOTALL).group(0)
+        with metrics.timer('parse', urlsplit(url).hostname):
+            return re.search(exp, text,flags=re.DOTALL).group(0)
 
 def main():
     start_time = time.time()
-    with requests.Session() as session:
+    with timed_session(metrics) as session:
         results = []
         for url in get_links():
             result = get_response(session, url)
             print(result)
 
     print(f"{(time.time() - start_time):.2f} seconds")
+    print(metrics.report())
+    metrics.write_json("timings.json")
+    metrics.write_prometheus("timings.prom")
 
 main()
\ No newline at end of file
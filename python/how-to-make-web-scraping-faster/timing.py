@@ -0,0 +1,265 @@
+# Where does the time go? Records how long each phase of a request takes,
+# per host, in fixed-bucket histograms.
+#
+# Phases:
+#   dns      - resolving the host name (aiohttp only)
+#   connect  - TCP connection (for requests this includes DNS)
+#   tls      - TLS handshake (requests only, aiohttp counts it in connect)
+#   ttfb     - from sending the request until the response headers arrive,
+#              after any new connection is set up, in both clients
+#   download - reading the response body
+#   parse    - whatever the caller wraps in metrics.timer('parse', host)
+#
+# A histogram only keeps bucket counters, a sum and a count, so recording a
+# value costs one bisect and there is no per-request storage. The results can
+# be written in Prometheus text format or as a JSON summary.
+import bisect
+import json
+import threading
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# Upper bounds in seconds: the Prometheus defaults, extended in both directions
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+METRIC_NAME = 'scraper_request_phase_seconds'
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q) -> float:
+        # Estimated by linear interpolation inside the bucket, the same way
+        # Prometheus' histogram_quantile() does it
+        if not self.count:
+            return float('nan')
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+
+class Metrics:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.histograms = {}  # (phase, host) -> Histogram
+        self.lock = threading.Lock()
+
+    def observe(self, phase, host, seconds):
+        # A URL without a host name is recorded under '', so the keys stay sortable
+        key = (phase, host or '')
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, phase, host):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(phase, host, time.perf_counter() - start)
+
+    def by_phase(self) -> dict:
+        # Merges the histograms of all hosts
+        merged = {}
+        with self.lock:
+            for (phase, _), histogram in self.histograms.items():
+                total = merged.setdefault(phase, Histogram(self.buckets))
+                total.counts = [a + b for a, b in zip(total.counts, histogram.counts)]
+                total.sum += histogram.sum
+                total.count += histogram.count
+        return merged
+
+    def summary(self) -> dict:
+        def describe(histogram):
+            return {
+                'count': histogram.count,
+                'mean': histogram.sum / histogram.count,
+                'p50': histogram.quantile(0.5),
+                'p90': histogram.quantile(0.9),
+                'p99': histogram.quantile(0.99),
+            }
+
+        hosts = {}
+        with self.lock:
+            for (phase, host), histogram in sorted(self.histograms.items()):
+                hosts.setdefault(host, {})[phase] = describe(histogram)
+        return {
+            'phases': {phase: describe(h) for phase, h in sorted(self.by_phase().items())},
+            'hosts': hosts,
+        }
+
+    def report(self) -> str:
+        # One line per phase, all hosts together, in milliseconds
+        lines = [f"{'phase':<10}{'count':>8}{'mean':>10}{'p50':>10}{'p90':>10}{'p99':>10}"]
+        for phase, h in sorted(self.by_phase().items()):
+            values = [h.sum / h.count, h.quantile(0.5), h.quantile(0.9), h.quantile(0.99)]
+            lines.append(f'{phase:<10}{h.count:>8}' + ''.join(f'{v * 1000:>8.1f}ms' for v in values))
+        return '\n'.join(lines)
+
+    def to_prometheus(self) -> str:
+        lines = [f'# HELP {METRIC_NAME} Duration of each phase of a request.',
+                 f'# TYPE {METRIC_NAME} histogram']
+        with self.lock:
+            for (phase, host), histogram in sorted(self.histograms.items()):
+                labels = f'phase="{phase}",host="{host}"'
+                cumulative = 0
+                for bound, count in zip(self.buckets + ('+Inf',), histogram.counts):
+                    cumulative += count
+                    lines.append(f'{METRIC_NAME}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'{METRIC_NAME}_sum{{{labels}}} {histogram.sum}')
+                lines.append(f'{METRIC_NAME}_count{{{labels}}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, file_name):
+        with open(file_name, 'w') as f:
+            f.write(self.to_prometheus())
+
+    def write_json(self, file_name):
+        with open(file_name, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+
+
+def aiohttp_trace_config(metrics) -> aiohttp.TraceConfig:
+    # Records dns, connect and ttfb. aiohttp has no hook for the end of the
+    # body, so wrap resp.text() in metrics.timer('download', host) instead.
+    async def on_request_start(session, ctx, params):
+        ctx.start = time.perf_counter()
+        ctx.dns = 0.0
+
+    async def on_dns_resolvehost_start(session, ctx, params):
+        ctx.dns_start = time.perf_counter()
+
+    async def on_dns_resolvehost_end(session, ctx, params):
+        ctx.dns = time.perf_counter() - ctx.dns_start
+        metrics.observe('dns', params.host, ctx.dns)
+
+    async def on_connection_create_start(session, ctx, params):
+        ctx.connect_start = time.perf_counter()
+
+    async def on_connection_create_end(session, ctx, params):
+        ctx.connect_end = time.perf_counter()
+        ctx.connect = ctx.connect_end - ctx.connect_start - ctx.dns
+
+    async def on_request_end(session, ctx, params):
+        host = params.url.host
+        if hasattr(ctx, 'connect'):
+            metrics.observe('connect', host, ctx.connect)
+            start = ctx.connect_end
+        else:
+            start = ctx.start  # a reused keep-alive connection
+        metrics.observe('ttfb', host, time.perf_counter() - start)
+
+    trace_config = aiohttp.TraceConfig(trace_config_ctx_factory=lambda trace_request_ctx: SimpleNamespace())
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_dns_resolvehost_start.append(on_dns_resolvehost_start)
+    trace_config.on_dns_resolvehost_end.append(on_dns_resolvehost_end)
+    trace_config.on_connection_create_start.append(on_connection_create_start)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    trace_config.on_request_end.append(on_request_end)
+    return trace_config
+
+
+def requests_hook(metrics):
+    # Response hook that records download. It runs before requests reads the
+    # body, so the body is read (and timed) here unless stream=True.
+    # response.elapsed is not used for ttfb because it includes connecting,
+    # TimedAdapter records ttfb instead.
+    def hook(response, *args, **kwargs):
+        host = urlsplit(response.url).hostname
+        if not kwargs.get('stream'):
+            with metrics.timer('download', host):
+                response.content
+        return response
+
+    return hook
+
+
+class TimedAdapter(HTTPAdapter):
+    # Records connect and tls of every new urllib3 connection, and the ttfb
+    # of every request
+    def __init__(self, metrics, **kwargs):
+        self.metrics = metrics
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        metrics = self.metrics
+
+        class ConnectTimer:
+            def _new_conn(self):
+                start = time.perf_counter()
+                sock = super()._new_conn()
+                self.connect_time = time.perf_counter() - start
+                metrics.observe('connect', self.host, self.connect_time)
+                return sock
+
+            def connect(self):
+                super().connect()
+                self.ttfb_start = time.perf_counter()
+
+            def request(self, *args, **kwargs):
+                # A new connection may still be set up inside request(), then
+                # connect() moves the start of ttfb past it
+                self.ttfb_start = time.perf_counter()
+                super().request(*args, **kwargs)
+
+            def getresponse(self):
+                response = super().getresponse()
+                metrics.observe('ttfb', self.host, time.perf_counter() - self.ttfb_start)
+                return response
+
+        class TimedHTTPConnection(ConnectTimer, HTTPConnection):
+            pass
+
+        class TimedHTTPSConnection(ConnectTimer, HTTPSConnection):
+            def connect(self):
+                start = time.perf_counter()
+                super().connect()
+                tls = time.perf_counter() - start - self.connect_time
+                metrics.observe('tls', self.host, tls)
+
+        class TimedHTTPConnectionPool(HTTPConnectionPool):
+            ConnectionCls = TimedHTTPConnection
+
+        class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+            ConnectionCls = TimedHTTPSConnection
+
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': TimedHTTPConnectionPool,
+            'https': TimedHTTPSConnectionPool,
+        }
+
+
+def timed_session(metrics) -> requests.Session:
+    session = requests.Session()
+    adapter = TimedAdapter(metrics)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.hooks['response'].append(requests_hook(metrics))
+    return session
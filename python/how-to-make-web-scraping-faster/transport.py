@@ -0,0 +1,129 @@
+# One fetch interface over two transports, so a script can switch between
+# HTTP/1.1 and HTTP/2 with a flag:
+#
+#   async with open_client(http2=True, limit=200) as client:
+#       page = await client.fetch(url)   # Page(url, status, headers, text)
+#
+# aiohttp speaks HTTP/1.1, where a connection carries one request at a time,
+# so 200 concurrent requests to a host need 200 sockets (and TLS handshakes).
+# httpx with h2 speaks HTTP/2, where the same 200 requests are multiplexed as
+# streams over one connection per host. Install it with:
+#   pip install "httpx[http2,brotli,zstd]"
+#
+# Both send an Accept-Encoding header with every encoding they can decode and
+# decompress the body chunk by chunk as it is read, so a compressed page is
+# never held in memory twice. httpx accepts zstd, br, gzip and deflate. aiohttp
+# accepts br only when the brotli package is installed, plus gzip and deflate.
+import asyncio
+from collections import namedtuple
+from contextlib import nullcontext
+from time import perf_counter
+
+import aiohttp
+
+from timing import aiohttp_trace_config
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+HTTP2 = False
+LIMIT = 100  # requests in flight at once
+TIMEOUT_IN_SECONDS = 30
+
+# Exceptions a retrier should treat as connection problems, for both transports
+CONNECTION_ERRORS = (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+if httpx is not None:
+    CONNECTION_ERRORS += (httpx.TransportError,)
+
+
+class HTTPStatusError(Exception):
+    pass
+
+
+class Page(namedtuple('Page', 'url status headers text')):
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise HTTPStatusError(f'{self.status} for {self.url}')
+
+
+class BaseClient:
+    # What both transports share: the optional metrics and the async context
+    # manager. Subclasses implement fetch() and close().
+    def __init__(self, metrics=None):
+        self.metrics = metrics
+
+    async def fetch(self, url, headers=None) -> Page:
+        raise NotImplementedError
+
+    def _timer(self, phase, host):
+        return self.metrics.timer(phase, host) if self.metrics else nullcontext()
+
+    async def close(self):
+        raise NotImplementedError
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+class AiohttpClient(BaseClient):
+    # HTTP/1.1, one connection per request in flight
+    def __init__(self, limit=LIMIT, timeout=TIMEOUT_IN_SECONDS, ssl=True, metrics=None):
+        super().__init__(metrics)
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=limit, ssl=ssl),
+            timeout=aiohttp.ClientTimeout(total=timeout),
+            trace_configs=[aiohttp_trace_config(metrics)] if metrics else None,
+        )
+
+    async def fetch(self, url, headers=None) -> Page:
+        async with self.session.get(url, headers=headers) as resp:
+            with self._timer('download', resp.url.host):
+                text = await resp.text()
+            return Page(str(resp.url), resp.status, resp.headers, text)
+
+    async def close(self):
+        await self.session.close()
+
+
+class HttpxClient(BaseClient):
+    # HTTP/2 when the server offers it (ALPN), HTTP/1.1 otherwise. Records
+    # ttfb and download, httpx has no hooks for dns, connect or tls.
+    def __init__(self, limit=LIMIT, timeout=TIMEOUT_IN_SECONDS, ssl=True, metrics=None, http2=True):
+        if httpx is None:
+            raise RuntimeError('HTTP/2 needs httpx, run: pip install "httpx[http2,brotli,zstd]"')
+        super().__init__(metrics)
+        # A connection carries many streams, so the limit is on requests, not
+        # connections. trust_env=False ignores proxy variables, like aiohttp.
+        self.semaphore = asyncio.Semaphore(limit)
+        self.session = httpx.AsyncClient(
+            http2=http2,
+            verify=ssl,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=limit, max_keepalive_connections=limit),
+            trust_env=False,
+        )
+
+    async def fetch(self, url, headers=None) -> Page:
+        async with self.semaphore:
+            start = perf_counter()
+            async with self.session.stream('GET', url, headers=headers) as resp:
+                if self.metrics:
+                    self.metrics.observe('ttfb', resp.url.host, perf_counter() - start)
+                with self._timer('download', resp.url.host):
+                    await resp.aread()
+                return Page(str(resp.url), resp.status_code, resp.headers, resp.text)
+
+    async def close(self):
+        await self.session.aclose()
+
+
+def open_client(http2=HTTP2, limit=LIMIT, timeout=TIMEOUT_IN_SECONDS, ssl=True, metrics=None):
+    # ssl: True to verify certificates, False to skip it, or an ssl.SSLContext
+    if http2:
+        return HttpxClient(limit, timeout, ssl, metrics)
+    return AiohttpClient(limit, timeout, ssl, metrics)
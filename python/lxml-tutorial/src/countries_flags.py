@@ -1,13 +1,11 @@
 import requests
 from lxml import html
 
+from row_extractor import COUNTRY_SCHEMA
+
 response = requests.get(
     'https://en.wikipedia.org/wiki/List_of_countries_by_population_in_2010')
 
 tree = html.fromstring(response.text)
-countries = tree.xpath('//span[@class="flagicon"]')
-for country in countries:
-    flag = country.xpath('./img/@src')[0]
-    country = country.xpath('./following-sibling::a/text()')[0]
-    print(country, ":", flag)
-    
\ No newline at end of file
+for record in COUNTRY_SCHEMA.extract(tree):
+    print(record['country'], ":", record['flag'])
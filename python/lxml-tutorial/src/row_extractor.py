@@ -0,0 +1,31 @@
+from lxml import etree
+
+
+class RowSchema:
+    # All XPath expressions are compiled once and reused for every row.
+    # rows: XPath that selects one node per record
+    # fields: field name -> XPath relative to that node
+    def __init__(self, rows, fields):
+        self.rows = etree.XPath(rows)
+        self.fields = [
+            (name, etree.XPath(expression, smart_strings=False))
+            for name, expression in fields.items()
+        ]
+
+    def extract(self, tree):
+        # Records are yielded one by one, nothing is collected in a list
+        for row in self.rows(tree):
+            record = {}
+            for name, xpath in self.fields:
+                result = xpath(row)
+                record[name] = result[0] if result else None
+            yield record
+
+
+COUNTRY_SCHEMA = RowSchema(
+    '//span[@class="flagicon"]',
+    {
+        'country': './following-sibling::a[1]/text()',
+        'flag': './img/@src',
+    },
+)
@@ -0,0 +1,64 @@
+# Writes XML/HTML incrementally with etree.xmlfile / etree.htmlfile.
+# Unlike building the whole tree with SubElement and calling tostring(),
+# every element is written to the file as soon as it is produced, so memory
+# stays the same no matter how many items are exported.
+import gzip
+from contextlib import contextmanager
+
+from lxml import etree
+
+
+@contextmanager
+def stream_document(file_name, root_tag, html=False, compress=False, **root_attrs):
+    # compress=True writes a gzip file, e.g. feed.xml.gz
+    factory = etree.htmlfile if html else etree.xmlfile
+    with factory(file_name, encoding='utf-8', compression=9 if compress else None) as xf:
+        if not html:
+            xf.write_declaration()
+        with xf.element(root_tag, **root_attrs):
+            yield xf
+
+
+def item_element(tag, fields):
+    element = etree.Element(tag)
+    for name, value in fields.items():
+        child = etree.SubElement(element, name)
+        child.text = '' if value is None else str(value)
+    return element
+
+
+def write_items(file_name, items, root_tag='items', item_tag='item', compress=False):
+    # items can be any iterable, e.g. a generator reading from a database
+    count = 0
+    with stream_document(file_name, root_tag, compress=compress) as xf:
+        for item in items:
+            xf.write(item_element(item_tag, item), pretty_print=True)
+            count += 1
+    return count
+
+
+def write_page(file_name):
+    # Same page as creating_xml_html.py, written element by element
+    with stream_document(file_name, 'html', html=True) as xf:
+        with xf.element('head'):
+            with xf.element('title'):
+                xf.write('This is Page Title')
+        with xf.element('body'):
+            with xf.element('h1', style='font-size:20pt', id='head'):
+                xf.write('Hello World!')
+            with xf.element('p', id='firstPara'):
+                xf.write('This HTML is XML Compliant!')
+            with xf.element('p', id='secondPara'):
+                xf.write('This is the second paragraph.')
+
+
+if __name__ == '__main__':
+    write_page('streamed.html')
+
+    products = ({'id': i, 'title': f'Product {i}', 'price': i / 100} for i in range(1_000_000))
+    total = write_items('products.xml.gz', products, root_tag='products', item_tag='product',
+                        compress=True)
+    print(f'Wrote {total} products')
+
+    with gzip.open('products.xml.gz') as f:
+        print(f.read(200).decode())
@@ -0,0 +1,109 @@
+# Compares a full page load with the lean render mode from books.py against a
+# local static site, so the numbers do not depend on the network.
+# Usage: python benchmark_lean_render.py
+import asyncio
+import statistics
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from playwright.async_api import async_playwright
+
+from books import lean_render
+
+RUNS = 10
+LATENCY_IN_SECONDS = 0.05
+IMAGES = 20
+THIRD_PARTY_HOST = 'localhost'  # the page itself is served from 127.0.0.1
+
+
+def build_site(port):
+    books = ''.join(
+        f'<article class="product_pod"><img src="/img/{i}.jpg">'
+        f'<h3>Book {i}</h3><p class="price_color">£{i}.00</p>'
+        f'<p class="availability">In stock</p></article>'
+        for i in range(IMAGES)
+    )
+    index = (
+        '<html><head><link rel="stylesheet" href="/style.css">'
+        f'<script src="http://{THIRD_PARTY_HOST}:{port}/tracker.js"></script>'
+        f'</head><body>{books}</body></html>'
+    )
+    site = {
+        '/': ('text/html', index.encode()),
+        '/style.css': ('text/css', b'@font-face{font-family:f;src:url(/font.woff2)}'
+                                   b'body{font-family:f}' + b' ' * 50_000),
+        '/font.woff2': ('font/woff2', b'\0' * 80_000),
+        '/tracker.js': ('application/javascript', b'var t=1;' + b' ' * 100_000),
+    }
+    for i in range(IMAGES):
+        site[f'/img/{i}.jpg'] = ('image/jpeg', b'\0' * 60_000)
+    return site
+
+
+def start_server():
+    stats = {'bytes': 0, 'requests': 0}
+    lock = threading.Lock()
+    site = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(LATENCY_IN_SECONDS)
+            content_type, body = site.get(self.path, ('text/plain', b''))
+            self.send_response(200 if self.path in site else 404)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Cache-Control', 'no-store')
+            self.end_headers()
+            self.wfile.write(body)
+            with lock:
+                stats['bytes'] += len(body)
+                stats['requests'] += 1
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('0.0.0.0', 0), Handler)
+    site.update(build_site(server.server_address[1]))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stats
+
+
+async def measure(browser, url, stats, lean):
+    times = []
+    served_bytes = served_requests = 0
+    for _ in range(RUNS):
+        context = await browser.new_context()
+        page = await context.new_page()
+        if lean:
+            await lean_render(page, domains={THIRD_PARTY_HOST})
+        before = dict(stats)
+        start = time.perf_counter()
+        await page.goto(url, wait_until='load')
+        await page.inner_text('.product_pod h3')
+        times.append(time.perf_counter() - start)
+        served_bytes += stats['bytes'] - before['bytes']
+        served_requests += stats['requests'] - before['requests']
+        await context.close()
+    return statistics.median(times), served_bytes / RUNS, served_requests / RUNS
+
+
+async def main():
+    server, stats = start_server()
+    url = f'http://127.0.0.1:{server.server_address[1]}/'
+    async with async_playwright() as pw:
+        browser = await pw.chromium.launch()
+        full = await measure(browser, url, stats, lean=False)
+        lean = await measure(browser, url, stats, lean=True)
+        await browser.close()
+    server.shutdown()
+
+    print(f"{'mode':<8}{'load time':>12}{'requests':>10}{'transferred':>14}")
+    for name, (load_time, size, requests) in (('full', full), ('lean', lean)):
+        print(f"{name:<8}{load_time * 1000:>10.0f}ms{requests:>10.0f}{size / 1024:>11.0f} KiB")
+    print(f"Lean render: {1 - lean[0] / full[0]:.0%} faster, "
+          f"{1 - lean[1] / full[1]:.0%} less data")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
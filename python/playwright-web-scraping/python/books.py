@@ -1,26 +1,94 @@
-from playwright.async_api import async_playwright
+from playwright.async_api import async_playwright, Error as PlaywrightError
+from urllib.parse import urlparse
 import asyncio
 
+LEAN_RENDER = True
+BLOCKED_RESOURCE_TYPES = {'image', 'font', 'stylesheet', 'media'}
+BLOCKED_DOMAINS = {'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'facebook.net'}
+
+
+def is_blocked(request, resource_types=BLOCKED_RESOURCE_TYPES, domains=BLOCKED_DOMAINS):
+    if request.resource_type in resource_types:
+        return True
+    host = urlparse(request.url).hostname or ''
+    return any(host == domain or host.endswith('.' + domain) for domain in domains)
+
+
+async def lean_render(page, resource_types=BLOCKED_RESOURCE_TYPES, domains=BLOCKED_DOMAINS):
+    # Abort every request that is not needed to read the text of the page
+    async def handle(route):
+        if is_blocked(route.request, resource_types, domains):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    await page.route('**/*', handle)
+
+
+# Field -> selector, or field -> (selector, attribute)
+BOOK_SCHEMA = {
+    'name': 'h3',
+    'price': '.price_color',
+    'stock': '.availability',
+}
+
+# Runs inside the browser: extracts every field of every item in one call,
+# instead of one query_selector and one inner_text round trip per field.
+EXTRACT_JS = """(items, schema) => items.map(item => {
+    const record = {};
+    for (const [field, rule] of Object.entries(schema)) {
+        const [selector, attribute] = Array.isArray(rule) ? rule : [rule, null];
+        const el = item.querySelector(selector);
+        if (!el) {
+            record[field] = null;
+        } else {
+            record[field] = attribute ? el.getAttribute(attribute) : el.innerText.trim();
+        }
+    }
+    return record;
+})"""
+
+
+async def extract(page, item_selector, schema):
+    return await page.eval_on_selector_all(item_selector, EXTRACT_JS, schema)
+
+
+async def scrape_pages(browser, urls, item_selector, schema, contexts=4):
+    # Every worker owns one browser context, the pages are shared through a queue
+    queue = asyncio.Queue()
+    for url in urls:
+        queue.put_nowait(url)
+    results = {}
+
+    async def worker():
+        context = await browser.new_context()
+        page = await context.new_page()
+        if LEAN_RENDER:
+            await lean_render(page)
+        try:
+            while not queue.empty():
+                url = queue.get_nowait()
+                try:
+                    await page.goto(url)
+                    results[url] = await extract(page, item_selector, schema)
+                except PlaywrightError as e:
+                    # A page that fails or times out is reported and skipped,
+                    # the worker goes on with the next one
+                    print(f'Failed to scrape {url}: {e}')
+        finally:
+            await context.close()
+
+    await asyncio.gather(*[worker() for _ in range(min(contexts, len(urls)))])
+    return [record for url in urls for record in results.get(url, [])]
+
 
 async def main():
+    urls = [f'https://books.toscrape.com/catalogue/page-{n}.html' for n in range(1, 51)]
     async with async_playwright() as pw:
         browser = await pw.chromium.launch()
-        page = await browser.new_page()
-        await page.goto('https://books.toscrape.com')
-
-        all_items = await page.query_selector_all('.product_pod')
-        books = []
-        for item in all_items:
-            book = {}
-            name_el = await item.query_selector('h3')
-            book['name'] = await name_el.inner_text()
-            price_el = await item.query_selector('.price_color')
-            book['price'] = await price_el.inner_text()
-            stock_el = await item.query_selector('.availability')
-            book['stock'] = await stock_el.inner_text()
-            books.append(book)
+        books = await scrape_pages(browser, urls, '.product_pod', BOOK_SCHEMA)
         print(books)
         await browser.close()
 
 if __name__ == '__main__':
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
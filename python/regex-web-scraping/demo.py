@@ -1,10 +1,17 @@
 # Importing the required libraries.
-import requests
 from bs4 import BeautifulSoup
 import re
 
+from response_archive import open_session
+
+# "record" keeps a copy of the page in ARCHIVE_DIR and "replay" reuses it
+# while the regular expressions below are being tuned
+ARCHIVE_MODE = None
+ARCHIVE_DIR = "responses"
+
 # Requesting the HTML from the web page.
-page = requests.get("https://books.toscrape.com/")
+with open_session(ARCHIVE_MODE, ARCHIVE_DIR) as session:
+    page = session.get("https://books.toscrape.com/")
 
 # Selecting the data.
 soup = BeautifulSoup(page.content, "html.parser")
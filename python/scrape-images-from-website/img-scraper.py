@@ -5,18 +5,25 @@ import pandas as pd
 import requests
 from bs4 import BeautifulSoup
 from PIL import Image
-from selenium import webdriver
 
+from driver_pool import DriverPool
 
-def get_content_from_url(url):
-   driver = webdriver.Chrome()  # add "executable_path=" if driver not in running directory
+
+def get_content_from_url(driver, url):
    driver.get(url)
    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
    page_content = driver.page_source
-   driver.quit()  # We do not need the browser instance for further steps.
    return page_content
 
 
+def get_contents_from_urls(urls, workers=4):
+   # The browsers are started once and reused for all URLs.
+   if not urls:
+       return []
+   with DriverPool(size=min(workers, len(urls))) as pool:
+       return pool.map(get_content_from_url, urls)
+
+
 def parse_image_urls(content, classes, location, source):
    soup = BeautifulSoup(content)
    results = []
@@ -43,11 +50,12 @@ def get_and_save_image_to_file(image_url, output_dir):
 
 
 def main():
-   url = "https://your.url/here?yes=brilliant"
-   content = get_content_from_url(url)
-   image_urls = parse_image_urls(
-       content=content, classes="blog-card__link", location="img", source="src",
-   )
+   urls = ["https://your.url/here?yes=brilliant"]
+   image_urls = []
+   for content in get_contents_from_urls(urls):
+       image_urls.extend(parse_image_urls(
+           content=content, classes="blog-card__link", location="img", source="src",
+       ))
    save_urls_to_csv(image_urls)
 
    for image_url in image_urls: